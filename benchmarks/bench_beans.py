@@ -0,0 +1,91 @@
+"""Bean load time and memory per bean.
+
+python benchmarks/bench_beans.py -n 10000 -n 100000 -n 1000000
+"""
+
+import gc
+import time
+import tracemalloc
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.pod import Pod
+
+
+async def noop(**kwargs):
+    pass
+
+
+def create_pod(loop, num):
+    pod = Pod(loop=loop)
+    for _ in range(num):
+        pod.add_bean(noop)
+    return pod
+
+
+def bench_time(num, loop_type):
+    loop = new_loop(loop_type)
+    try:
+        pod = create_pod(loop, num)
+        gc.collect()
+        start = time.perf_counter()
+        pod._load_beans()
+        loaded = time.perf_counter()
+        loop.run_until_complete(pod.run())
+        finished = time.perf_counter()
+    finally:
+        close_loop(loop)
+    return loaded - start, finished - loaded
+
+
+def bench_memory(num, loop_type):
+    loop = new_loop(loop_type)
+    try:
+        pod = create_pod(loop, num)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            pod._load_beans()
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        loop.run_until_complete(pod.run())
+    finally:
+        close_loop(loop)
+    return current - start
+
+
+def bench(num, loop_type="asyncio"):
+    load_time, run_time = bench_time(num, loop_type)
+    memory = bench_memory(num, loop_type)
+    return {
+        "beans": num,
+        "load_time": load_time,
+        "run_time": run_time,
+        "load_us_per_bean": load_time / num * 1e6,
+        "bytes_per_bean": memory / num,
+    }
+
+
+def run(loop_type="asyncio"):
+    return [bench(n, loop_type) for n in (10000, 100000)]
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, multiple=True)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(num, loop_type):
+    for n in num or (10000, 100000, 1000000):
+        r = bench(n, loop_type or "asyncio")
+        click.echo(
+            f"beans: {r['beans']:>8}  "
+            f"load: {r['load_time']:.3f}s ({r['load_us_per_bean']:.2f}us/bean)  "
+            f"run: {r['run_time']:.3f}s  "
+            f"memory: {r['bytes_per_bean']:.0f}B/bean"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Item passing between coroutines, asyncio.Queue vs channel.
+
+python benchmarks/bench_channel.py -n 1000000 -p 1 -p 4 -c 1 -c 4
+"""
+
+import asyncio
+import time
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.channel import Channel, ChannelClosed
+
+STOP = object()
+
+
+async def queue_producer(queue, num):
+    for i in range(num):
+        await queue.put(i)
+
+
+async def queue_consumer(queue):
+    count = 0
+    while True:
+        item = await queue.get()
+        if item is STOP:
+            return count
+        count += 1
+
+
+async def queue_flow(loop, producers, consumers, num, maxsize, batch):
+    queue = asyncio.Queue(maxsize)
+    tasks = [queue_consumer(queue) for _ in range(consumers)]
+    consuming = asyncio.gather(*tasks)
+    await asyncio.gather(*[queue_producer(queue, num) for _ in range(producers)])
+    for _ in range(consumers):
+        await queue.put(STOP)
+    return sum(await consuming)
+
+
+async def channel_producer(channel, num):
+    for i in range(num):
+        await channel.put(i)
+
+
+async def channel_consumer(channel, batch):
+    count = 0
+    try:
+        if batch:
+            while True:
+                count += len(await channel.get_batch(batch))
+        else:
+            while True:
+                await channel.get()
+                count += 1
+    except ChannelClosed:
+        return count
+
+
+async def channel_flow(loop, producers, consumers, num, maxsize, batch):
+    channel = Channel("bench", maxsize, loop=loop)
+    tasks = [channel_consumer(channel, batch) for _ in range(consumers)]
+    consuming = asyncio.gather(*tasks)
+    await asyncio.gather(*[channel_producer(channel, num) for _ in range(producers)])
+    channel.close()
+    return sum(await consuming)
+
+
+FLOWS = {
+    "queue": (queue_flow, None),
+    "channel": (channel_flow, None),
+    "channel-batch": (channel_flow, 256),
+}
+
+
+def bench(name, producers, consumers, num, maxsize, loop_type="asyncio"):
+    flow, batch = FLOWS[name]
+    loop = new_loop(loop_type)
+    try:
+        start = time.perf_counter()
+        count = loop.run_until_complete(
+            flow(loop, producers, consumers, num, maxsize, batch)
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        close_loop(loop)
+    assert count == num * producers, f"Got {count}, expected {num * producers}"
+    return {
+        "flow": name,
+        "producers": producers,
+        "consumers": consumers,
+        "items": count,
+        "time": elapsed,
+        "items_per_second": count / elapsed,
+    }
+
+
+def run(loop_type="asyncio", num=200000, maxsize=1024):
+    return [
+        bench(name, p, c, num // p, maxsize, loop_type)
+        for p, c in ((1, 1), (4, 4))
+        for name in FLOWS
+    ]
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, default=200000)
+@click.option("-p", "--producers", type=click.INT, multiple=True)
+@click.option("-c", "--consumers", type=click.INT, multiple=True)
+@click.option("-m", "--maxsize", type=click.INT, default=1024)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(num, producers, consumers, maxsize, loop_type):
+    for p in producers or (1, 4):
+        for c in consumers or (1, 4):
+            for name in FLOWS:
+                r = bench(name, p, c, num // p, maxsize, loop_type or "asyncio")
+                click.echo(
+                    f"producers: {p:>2}  consumers: {c:>2}  {name:>13}  "
+                    f"{r['time']:.3f}s  {r['items_per_second'] / 1e6:.2f}M items/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
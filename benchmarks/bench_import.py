@@ -0,0 +1,75 @@
+"""CLI startup time, with a cold and a warm command index.
+
+python benchmarks/bench_import.py -n 20
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+SCRIPT = (
+    "import sys; from os_aio_pod.main import main; "
+    "sys.argv[0] = 'os-aio-pod'; main()"
+)
+
+COMMANDS = {
+    "version": ["--version"],
+    "help": ["--help"],
+    "run-help": ["run", "--help"],
+}
+
+
+def startup(args, cache_dir):
+    env = dict(os.environ, OS_AIO_POD_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", SCRIPT] + args,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def bench(name, num, warm):
+    times = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if warm:
+            startup(COMMANDS["help"], cache_dir)
+        for _ in range(num):
+            if not warm:
+                index = os.path.join(cache_dir, "commands.json")
+                if os.path.exists(index):
+                    os.remove(index)
+            times.append(startup(COMMANDS[name], cache_dir))
+    return {
+        "command": name,
+        "index": "warm" if warm else "cold",
+        "runs": num,
+        "median": statistics.median(times),
+        "min": min(times),
+    }
+
+
+def run(loop_type="asyncio", num=20):
+    # startup does not depend on the loop type
+    return [bench(name, num, warm) for name in COMMANDS for warm in (False, True)]
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, default=20)
+def main(num):
+    for r in run(num=num):
+        click.echo(
+            f"{r['command']:>8}  {r['index']:>4}  "
+            f"median: {r['median'] * 1e3:.1f}ms  min: {r['min'] * 1e3:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""pcflow items per second by consumers and queue size.
+
+python benchmarks/bench_pcflow.py -c 1 -c 10 -q 10 -q 1000
+"""
+
+import time
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.contrib.pcflow import Server
+from os_aio_pod.pod import Pod
+
+
+class CountServer(Server):
+    async def produce(self, num, **kwargs):
+        for i in range(num):
+            yield i
+
+    async def consume(self, obj, **kwargs):
+        pass
+
+
+def bench(num, consumers, queue_size, loop_type="asyncio"):
+    loop = new_loop(loop_type)
+    try:
+        pod = Pod(loop=loop)
+        pod.add_bean(
+            CountServer, num=num, consumer_num=consumers, queue_size=queue_size
+        )
+        start = time.perf_counter()
+        loop.run_until_complete(pod.run())
+        elapsed = time.perf_counter() - start
+    finally:
+        close_loop(loop)
+    return {
+        "items": num,
+        "consumers": consumers,
+        "queue_size": queue_size,
+        "time": elapsed,
+        "items_per_second": num / elapsed,
+    }
+
+
+def run(loop_type="asyncio", num=100000):
+    return [bench(num, c, q, loop_type) for c in (1, 10, 100) for q in (1, 10, 1000)]
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, default=100000)
+@click.option("-c", "--consumers", type=click.INT, multiple=True)
+@click.option("-q", "--queue-size", type=click.INT, multiple=True)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(num, consumers, queue_size, loop_type):
+    for c in consumers or (1, 10, 100):
+        for q in queue_size or (1, 10, 1000):
+            r = bench(num, c, q, loop_type or "asyncio")
+            click.echo(
+                f"consumers: {c:>4}  queue size: {q:>5}  "
+                f"{r['time']:.3f}s  {r['items_per_second']:.0f} items/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
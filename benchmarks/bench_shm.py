@@ -0,0 +1,205 @@
+"""Records between two processes, shared memory channel vs loopback tcp.
+
+python benchmarks/bench_shm.py -n 200000 -s 64 -s 4096
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import struct
+import time
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.channel import ChannelClosed
+from os_aio_pod.shm import ShmChannel
+
+LENGTH = struct.Struct("I")
+COUNT = struct.Struct("Q")
+
+
+def shm_names(name):
+    return f"bench-{os.getpid()}-{name}-ab", f"bench-{os.getpid()}-{name}-ba"
+
+
+async def shm_peer(loop, names, echo):
+    inp = ShmChannel(names[0], loop=loop)
+    out = ShmChannel(names[1], producer=True, loop=loop)
+    count = 0
+    try:
+        while True:
+            batch = await inp.get_batch()
+            if echo:
+                for record in batch:
+                    await out.put(record)
+            count += len(batch)
+    except ChannelClosed:
+        pass
+    if not echo:
+        await out.put(COUNT.pack(count))
+    out.close()
+
+
+async def shm_throughput(loop, names, payload, num):
+    out = ShmChannel(names[0], producer=True, loop=loop)
+    back = ShmChannel(names[1], loop=loop)
+    start = time.perf_counter()
+    for _ in range(num):
+        await out.put(payload)
+    out.close()
+    count = COUNT.unpack(await back.get())[0]
+    elapsed = time.perf_counter() - start
+    back.close()
+    return count, elapsed
+
+
+async def shm_latency(loop, names, payload, num, latencies):
+    out = ShmChannel(names[0], producer=True, loop=loop)
+    back = ShmChannel(names[1], loop=loop)
+    for _ in range(num):
+        start = time.perf_counter()
+        await out.put(payload)
+        await back.get()
+        latencies.append(time.perf_counter() - start)
+    out.close()
+    back.close()
+
+
+async def tcp_peer(loop, sock, echo):
+    done = loop.create_future()
+
+    async def on_connect(reader, writer):
+        count = 0
+        try:
+            while True:
+                header = await reader.readexactly(LENGTH.size)
+                record = await reader.readexactly(LENGTH.unpack(header)[0])
+                if echo:
+                    writer.write(header + record)
+                count += 1
+        except asyncio.IncompleteReadError:
+            pass
+        if not echo:
+            writer.write(COUNT.pack(count))
+            await writer.drain()
+        writer.close()
+        done.set_result(None)
+
+    server = await asyncio.start_server(on_connect, sock=sock)
+    await done
+    server.close()
+
+
+async def tcp_throughput(loop, address, payload, num):
+    reader, writer = await asyncio.open_connection(*address)
+    frame = LENGTH.pack(len(payload)) + payload
+    start = time.perf_counter()
+    for _ in range(num):
+        writer.write(frame)
+        await writer.drain()
+    writer.write_eof()
+    count = COUNT.unpack(await reader.readexactly(COUNT.size))[0]
+    elapsed = time.perf_counter() - start
+    writer.close()
+    return count, elapsed
+
+
+async def tcp_latency(loop, address, payload, num, latencies):
+    reader, writer = await asyncio.open_connection(*address)
+    frame = LENGTH.pack(len(payload)) + payload
+    for _ in range(num):
+        start = time.perf_counter()
+        writer.write(frame)
+        await reader.readexactly(len(frame))
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+def peer(transport, target, echo, loop_type):
+    loop = new_loop(loop_type)
+    try:
+        if transport == "shm":
+            loop.run_until_complete(shm_peer(loop, target, echo))
+        else:
+            loop.run_until_complete(tcp_peer(loop, target, echo))
+    finally:
+        close_loop(loop)
+
+
+def bench(transport, size, num, loop_type="asyncio"):
+    payload = b"x" * size
+    latencies = []
+    result = {"transport": transport, "size": size, "records": num}
+    for echo in (False, True):
+        sock = None
+        if transport == "shm":
+            target = shm_names(f"{size}-{int(echo)}")
+        else:
+            sock = socket.socket()
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(1)
+            target = sock
+        process = multiprocessing.get_context("fork").Process(
+            target=peer, args=(transport, target, echo, loop_type)
+        )
+        process.start()
+        loop = new_loop(loop_type)
+        try:
+            if transport == "shm":
+                args = (loop, target, payload, num)
+                main = shm_latency if echo else shm_throughput
+            else:
+                args = (loop, sock.getsockname(), payload, num)
+                main = tcp_latency if echo else tcp_throughput
+            if echo:
+                loop.run_until_complete(main(*args, latencies))
+            else:
+                count, elapsed = loop.run_until_complete(main(*args))
+                assert count == num, f"Got {count}, expected {num}"
+        finally:
+            close_loop(loop)
+            process.join()
+            if sock is not None:
+                sock.close()
+    latencies.sort()
+    result.update(
+        {
+            "time": elapsed,
+            "records_per_second": num / elapsed,
+            "bytes_per_second": num * size / elapsed,
+            "latency_p50": latencies[len(latencies) // 2],
+            "latency_p99": latencies[int(len(latencies) * 0.99)],
+        }
+    )
+    return result
+
+
+def run(loop_type="asyncio", num=100000):
+    return [
+        bench(transport, size, num, loop_type)
+        for size in (64, 4096)
+        for transport in ("shm", "tcp")
+    ]
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, default=100000)
+@click.option("-s", "--size", type=click.INT, multiple=True)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(num, size, loop_type):
+    for s in size or (64, 4096):
+        for transport in ("shm", "tcp"):
+            r = bench(transport, s, num, loop_type or "asyncio")
+            click.echo(
+                f"size: {s:>6}  {transport:>4}  "
+                f"{r['records_per_second'] / 1e3:.0f}K records/s  "
+                f"{r['bytes_per_second'] / (1 << 20):.0f}MiB/s  "
+                f"p50: {r['latency_p50'] * 1e6:.0f}us  "
+                f"p99: {r['latency_p99'] * 1e6:.0f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Signal connect and fan-out, native dispatcher vs asyncio_dispatch.
+
+python benchmarks/bench_signal.py -n 1000 -n 10000
+"""
+
+import asyncio
+import time
+from itertools import chain
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.pod import SignalDispatcher
+
+LABEL_SIZE = 10
+
+
+class Sender(object):
+    def __init__(self, id, label):
+        self.id = id
+        self.label = label
+
+
+class Counter(object):
+    def __init__(self, loop, expected):
+        self.count = 0
+        self.expected = expected
+        self.done = asyncio.Event(loop=loop)
+
+    async def __call__(self, **kwargs):
+        self.count += 1
+        if self.count >= self.expected:
+            self.done.set()
+
+
+def senders(num):
+    return [Sender(i, f"label-{i // LABEL_SIZE}") for i in range(num)]
+
+
+async def native(loop, num):
+    dispatcher = SignalDispatcher(loop=loop)
+    beans = senders(num)
+    counter = Counter(loop, num)
+    start = time.perf_counter()
+    for bean in beans:
+        for sig in ("SIGINT", "SIGTERM"):
+            dispatcher.connect(sig, counter, bean.id, bean.label)
+    connected = time.perf_counter()
+    await dispatcher.send("SIGTERM")
+    await counter.done.wait()
+    broadcasted = time.perf_counter()
+    counter.count, counter.expected = 0, LABEL_SIZE
+    counter.done.clear()
+    await dispatcher.send("SIGTERM", labels=["label-0"])
+    await counter.done.wait()
+    finished = time.perf_counter()
+    return connected - start, broadcasted - connected, finished - broadcasted
+
+
+async def legacy(loop, num):
+    from asyncio_dispatch import Signal
+
+    dispatcher = Signal(loop=loop)
+    beans = senders(num)
+    label_index = {}
+    for bean in beans:
+        label_index.setdefault(bean.label, []).append(bean)
+    counter = Counter(loop, num)
+    start = time.perf_counter()
+    for bean in beans:
+        for sig in ("SIGINT", "SIGTERM"):
+            await dispatcher.connect(counter, key=sig, senders={bean})
+    connected = time.perf_counter()
+    await dispatcher.send(key="SIGTERM")
+    await counter.done.wait()
+    broadcasted = time.perf_counter()
+    counter.count, counter.expected = 0, LABEL_SIZE
+    counter.done.clear()
+    callers = set(chain(*[label_index[label] for label in ["label-0"]]))
+    await dispatcher.send(key="SIGTERM", senders=callers)
+    await counter.done.wait()
+    finished = time.perf_counter()
+    return connected - start, broadcasted - connected, finished - broadcasted
+
+
+def bench(num, loop_type="asyncio"):
+    results = []
+    for name, func in (("native", native), ("asyncio_dispatch", legacy)):
+        loop = new_loop(loop_type)
+        try:
+            connect, broadcast, label = loop.run_until_complete(func(loop, num))
+        except Exception as e:
+            click.echo(f"skip {name}: {e!r}", err=True)
+            continue
+        finally:
+            close_loop(loop)
+        results.append(
+            {
+                "dispatcher": name,
+                "beans": num,
+                "connect_time": connect,
+                "broadcast_time": broadcast,
+                "label_send_time": label,
+            }
+        )
+    return results
+
+
+def run(loop_type="asyncio"):
+    return [r for n in (1000, 10000) for r in bench(n, loop_type)]
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, multiple=True)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(num, loop_type):
+    for n in num or (1000, 10000):
+        for r in bench(n, loop_type or "asyncio"):
+            click.echo(
+                f"{r['dispatcher']:>16}  beans: {r['beans']:>7}  "
+                f"connect: {r['connect_time']:.4f}s  "
+                f"broadcast: {r['broadcast_time']:.4f}s  "
+                f"label send: {r['label_send_time']:.6f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
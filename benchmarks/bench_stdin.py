@@ -0,0 +1,104 @@
+"""Line reading throughput, readuntil vs chunked memoryview split.
+
+python benchmarks/bench_stdin.py -n 1000000 -l 100
+"""
+
+import asyncio
+import time
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.contrib.fromstdin import read_chunk_lines
+
+FEED_SIZE = 1 << 16
+
+
+def create_reader(loop, data, limit):
+    reader = asyncio.StreamReader(limit=limit, loop=loop)
+    for i in range(0, len(data), FEED_SIZE):
+        reader.feed_data(data[i : i + FEED_SIZE])
+    reader.feed_eof()
+    return reader
+
+
+async def readuntil(reader, chunk_size):
+    count = 0
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError:
+            break
+        count += 1
+    return count
+
+
+async def chunk_lines(reader, chunk_size):
+    count = 0
+    async for lines in read_chunk_lines(reader, chunk_size):
+        for line in lines:
+            line.tobytes()
+        count += len(lines)
+    return count
+
+
+async def chunk_batches(reader, chunk_size):
+    count = 0
+    async for lines in read_chunk_lines(reader, chunk_size):
+        count += len(lines)
+    return count
+
+
+READERS = {
+    "readuntil": readuntil,
+    "chunk": chunk_lines,
+    "chunk-batch": chunk_batches,
+}
+
+
+def bench(name, data, num, chunk_size, loop_type="asyncio"):
+    loop = new_loop(loop_type)
+    try:
+        reader = create_reader(loop, data, max(len(data), chunk_size * 2))
+        start = time.perf_counter()
+        count = loop.run_until_complete(READERS[name](reader, chunk_size))
+        elapsed = time.perf_counter() - start
+    finally:
+        close_loop(loop)
+    assert count == num, f"Read {count} lines, expected {num}"
+    return elapsed
+
+
+def run(loop_type="asyncio", num=1000000, line_size=100, chunk_size=1 << 18):
+    data = (b"x" * (line_size - 1) + b"\n") * num
+    results = []
+    for name in READERS:
+        elapsed = bench(name, data, num, chunk_size, loop_type)
+        results.append(
+            {
+                "reader": name,
+                "lines": num,
+                "line_size": line_size,
+                "time": elapsed,
+                "lines_per_second": num / elapsed,
+            }
+        )
+    return results
+
+
+@click.command()
+@click.option("-n", "--num", type=click.INT, default=1000000)
+@click.option("-l", "--line-size", type=click.INT, default=100)
+@click.option("-c", "--chunk-size", type=click.INT, default=1 << 18)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(num, line_size, chunk_size, loop_type):
+    for r in run(loop_type or "asyncio", num, line_size, chunk_size):
+        click.echo(
+            f"{r['reader']:>12}  {r['time']:.3f}s  "
+            f"{r['lines_per_second'] / 1e6:.2f}M lines/s  "
+            f"{r['lines_per_second'] * line_size / (1 << 20):.0f}MiB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
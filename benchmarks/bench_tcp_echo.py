@@ -0,0 +1,131 @@
+"""TCP echo round trips, streams vs protocol vs buffered protocol.
+
+python benchmarks/bench_tcp_echo.py -c 1 -c 100 -s 64 -s 4096
+"""
+
+import asyncio
+import time
+
+import click
+from common import close_loop, new_loop
+
+from os_aio_pod.contrib.tcp_server import Config, Server, TCPServerAdapter
+
+HOST = "127.0.0.1"
+PORT = 9399
+
+
+class StreamEchoServer(Server):
+    async def on_connect(self, reader, writer):
+        try:
+            while True:
+                data = await reader.read(self.config.limit)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+class BufferedEchoServer(Server):
+    def on_data(self, protocol, data):
+        protocol.transport.write(bytes(data))
+        return len(data)
+
+
+class EchoProtocol(asyncio.Protocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.transport.write(data)
+
+
+MODES = {
+    "streams": {"server": StreamEchoServer},
+    "protocol": {"protocol": EchoProtocol},
+    "buffered": {"server": BufferedEchoServer, "buffered": True},
+}
+
+
+async def client(size, num, latencies):
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    payload = b"x" * size
+    try:
+        for _ in range(num):
+            start = time.perf_counter()
+            writer.write(payload)
+            await reader.readexactly(size)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def echo(loop, mode, connections, size, num, latencies):
+    config = Config(host=HOST, port=PORT, **MODES[mode])
+    _, factory = TCPServerAdapter(None).create(config, loop)
+    server = await factory
+    try:
+        start = time.perf_counter()
+        clients = [client(size, num, latencies) for _ in range(connections)]
+        await asyncio.gather(*clients)
+        return time.perf_counter() - start
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def bench(mode, connections, size, num, loop_type="asyncio"):
+    loop = new_loop(loop_type)
+    latencies = []
+    try:
+        elapsed = loop.run_until_complete(
+            echo(loop, mode, connections, size, num, latencies)
+        )
+    finally:
+        close_loop(loop)
+    latencies.sort()
+    return {
+        "mode": mode,
+        "connections": connections,
+        "size": size,
+        "round_trips": len(latencies),
+        "time": elapsed,
+        "round_trips_per_second": len(latencies) / elapsed,
+        "latency_p50": latencies[len(latencies) // 2],
+        "latency_p99": latencies[int(len(latencies) * 0.99)],
+    }
+
+
+def run(loop_type="asyncio", num=10000):
+    return [
+        bench(mode, c, s, max(num // c, 1), loop_type)
+        for c in (1, 10, 100)
+        for s in (64, 4096, 65536)
+        for mode in MODES
+    ]
+
+
+@click.command()
+@click.option("-c", "--connections", type=click.INT, multiple=True)
+@click.option("-s", "--size", type=click.INT, multiple=True)
+@click.option("-n", "--num", type=click.INT, default=10000)
+@click.option("--loop-type", type=click.Choice(["asyncio", "uvloop"]))
+def main(connections, size, num, loop_type):
+    for c in connections or (1, 10, 100):
+        for s in size or (64, 4096, 65536):
+            n = max(num // c, 1)
+            for mode in MODES:
+                r = bench(mode, c, s, n, loop_type or "asyncio")
+                click.echo(
+                    f"connections: {c:>4}  size: {s:>6}  {mode:>8}  "
+                    f"{r['time']:.3f}s  "
+                    f"{r['round_trips_per_second']:.0f} round trips/s  "
+                    f"p50: {r['latency_p50'] * 1e6:.0f}us  "
+                    f"p99: {r['latency_p99'] * 1e6:.0f}us"
+                )
+
+
+if __name__ == "__main__":
+    main()
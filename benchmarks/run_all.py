@@ -0,0 +1,79 @@
+"""Run the benchmark suites under each loop type and save JSON results.
+
+python benchmarks/run_all.py -o results.json
+python benchmarks/run_all.py -s pcflow -s tcp_echo --loop-type asyncio
+"""
+
+import json
+import platform
+import subprocess
+import time
+
+import bench_beans
+import bench_channel
+import bench_import
+import bench_pcflow
+import bench_shm
+import bench_signal
+import bench_stdin
+import bench_tcp_echo
+import click
+
+SUITES = {
+    "beans": bench_beans.run,
+    "signal": bench_signal.run,
+    "pcflow": bench_pcflow.run,
+    "channel": bench_channel.run,
+    "shm": bench_shm.run,
+    "stdin": bench_stdin.run,
+    "tcp_echo": bench_tcp_echo.run,
+    "import": bench_import.run,
+}
+
+
+def loop_types():
+    types = ["asyncio"]
+    try:
+        import uvloop  # noqa: F401
+
+        types.append("uvloop")
+    except ImportError:
+        pass
+    return types
+
+
+def git_commit():
+    command = ["git", "rev-parse", "HEAD"]
+    try:
+        output = subprocess.check_output(command, stderr=subprocess.DEVNULL)
+    except Exception:
+        return None
+    return output.decode().strip()
+
+
+@click.command()
+@click.option("-o", "--output", type=click.Path(), default="benchmark-results.json")
+@click.option("-s", "--suite", type=click.Choice(list(SUITES)), multiple=True)
+@click.option(
+    "--loop-type", type=click.Choice(["asyncio", "uvloop"]), multiple=True
+)
+def main(output, suite, loop_type):
+    results = {}
+    for lt in loop_type or loop_types():
+        for name in suite or SUITES:
+            click.echo(f"Running {name} on {lt}", err=True)
+            results.setdefault(lt, {})[name] = SUITES[name](lt)
+    report = {
+        "commit": git_commit(),
+        "time": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    click.echo(f"Saved {output}", err=True)
+
+
+if __name__ == "__main__":
+    main()
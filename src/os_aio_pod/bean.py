@@ -1,24 +1,58 @@
 from asyncio import Task
-from itertools import chain
+from collections.abc import Coroutine
+from time import perf_counter
+
+from os_aio_pod.metrics import BeanMetrics
+from os_aio_pod.shm import DEFAULT_SIZE
 
 
 class BeanContext(object):
+    __slots__ = ("id", "label", "pod", "instance", "_metrics")
+
     def __init__(self, pod, id, label=None):
         self.id = id
         self.label = label
         self.pod = pod
         self.instance = None
+        self._metrics = None
 
     @property
     def config(self):
         return self.pod.config
 
+    @property
+    def metrics(self):
+        if self._metrics is None:
+            self._metrics = BeanMetrics(self.pod.metrics, self.id, self.label)
+        return self._metrics
+
+    def channel(self, name, maxsize=0, producer=False):
+        channel = self.pod.channel(name, maxsize)
+        if producer:
+            channel.add_producer(self.id)
+        return channel
+
+    def shm_channel(self, name, producer=False, size=DEFAULT_SIZE):
+        channel = self.pod.shm_channel(name, producer, size)
+        if producer:
+            channel.add_producer(self.id)
+        return channel
+
+    def run_in_thread(self, fn, *args):
+        return self.pod.run_in_thread(fn, *args, executor=self.label)
+
+    def process_pool(self, workers=None):
+        return self.pod.process_pool(workers)
+
     async def wait_beans_done(self, bid_or_label):
         await self.pod.wait_beans_done(bid_or_label)
 
     def get_beans(self, bid_or_label):
         return self.pod.get_beans(bid_or_label)
 
+    def spawn(self, obj, label=None, **kwargs):
+        return self.pod.spawn(obj, label=label, **kwargs)
+
     @property
     def loop(self):
         return self.pod.loop
@@ -37,14 +71,13 @@ class BeanContext(object):
             sig, callback=callback, callers={self.bean}
         )
 
-    async def send_signal(self, sig, labels=None, **kwargs):
-        beans = None
-        if labels is not None:
-            beans = set(chain(*[self.pod.get_beans(label) for label in labels]))
-        return await self.pod.send_signal(sig, callers=beans, **kwargs)
+    async def send_signal(self, sig, labels=None, timeout=None, **kwargs):
+        return await self.pod.send_signal(sig, labels=labels, timeout=timeout, **kwargs)
 
 
 class Bean(Task):
+    __slots__ = ("context",)
+
     def __init__(self, context, coro, *, loop=None):
         super(Bean, self).__init__(coro, loop=loop)
         self.context = context
@@ -61,3 +94,56 @@ class Bean(Task):
     @property
     def label(self):
         return self.context.label
+
+
+class BeanStats(object):
+    __slots__ = ("steps", "time", "max_step")
+
+    def __init__(self):
+        self.steps = 0
+        self.time = 0.0
+        self.max_step = 0.0
+
+    def record(self, elapsed):
+        self.steps += 1
+        self.time += elapsed
+        if elapsed > self.max_step:
+            self.max_step = elapsed
+
+    def dict(self):
+        return {"steps": self.steps, "time": self.time, "max_step": self.max_step}
+
+
+class TimedCoroutine(Coroutine):
+    """Coroutine proxy which records the time of each step in ``stats``."""
+
+    __slots__ = ("coro", "stats")
+
+    def __init__(self, coro, stats):
+        self.coro = coro
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.coro, name)
+
+    def send(self, value):
+        start = perf_counter()
+        try:
+            return self.coro.send(value)
+        finally:
+            self.stats.record(perf_counter() - start)
+
+    def throw(self, typ, val=None, tb=None):
+        start = perf_counter()
+        try:
+            if val is None and tb is None:
+                return self.coro.throw(typ)
+            return self.coro.throw(typ, val, tb)
+        finally:
+            self.stats.record(perf_counter() - start)
+
+    def close(self):
+        return self.coro.close()
+
+    def __await__(self):
+        return self.coro.__await__()
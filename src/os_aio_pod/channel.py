@@ -0,0 +1,165 @@
+import asyncio
+from collections import deque
+
+
+class ChannelClosed(Exception):
+    pass
+
+
+class Channel(object):
+    """Bounded channel for several producers and consumers.
+
+    Items are kept in a deque, a put wakes one waiting consumer and a get
+    wakes one waiting producer, ``get_batch`` takes all the available items
+    up to ``max_n`` at once. The channel closes when ``close`` is called or
+    when all its producer beans are done, consumers get the remaining items
+    and then ``ChannelClosed``.
+    """
+
+    def __init__(self, name, maxsize=0, loop=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.closed = False
+        self.puts = 0
+        self.gets = 0
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self._items = deque()
+        self._getters = deque()
+        self._putters = deque()
+        self._producers = set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def full(self):
+        return 0 < self.maxsize <= len(self._items)
+
+    def add_producer(self, bid):
+        self._producers.add(bid)
+
+    def remove_producer(self, bid):
+        if bid in self._producers:
+            self._producers.discard(bid)
+            if not self._producers:
+                self.close()
+
+    def close(self):
+        self.closed = True
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _wakeup(self, waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _timeout(self, waiters, waiter):
+        if not waiter.done():
+            waiter.set_result(None)
+            waiters.remove(waiter)
+
+    async def _wait(self, waiters, timeout=None):
+        waiter = self._loop.create_future()
+        waiters.append(waiter)
+        handle = None
+        if timeout is not None:
+            handle = self._loop.call_later(timeout, self._timeout, waiters, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # woken up but cancelled, pass the wakeup on
+                self._wakeup(waiters)
+            raise
+        finally:
+            if handle is not None:
+                handle.cancel()
+
+    def put_nowait(self, item):
+        if self.closed:
+            raise ChannelClosed(self.name)
+        if 0 < self.maxsize <= len(self._items):
+            raise asyncio.QueueFull
+        self._items.append(item)
+        self.puts += 1
+        if self._getters:
+            self._wakeup(self._getters)
+
+    async def put(self, item):
+        while 0 < self.maxsize <= len(self._items) and not self.closed:
+            await self._wait(self._putters)
+        self.put_nowait(item)
+
+    def get_nowait(self):
+        if not self._items:
+            if self.closed:
+                raise ChannelClosed(self.name)
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        self.gets += 1
+        if self._putters:
+            self._wakeup(self._putters)
+        return item
+
+    async def get(self):
+        while not self._items:
+            if self.closed:
+                raise ChannelClosed(self.name)
+            await self._wait(self._getters)
+        return self.get_nowait()
+
+    async def get_batch(self, max_n=None, timeout=None):
+        """Wait for items and get up to ``max_n`` of them.
+
+        Returns an empty list when no item comes within ``timeout``.
+        """
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while not self._items:
+            if self.closed:
+                raise ChannelClosed(self.name)
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    return []
+            await self._wait(self._getters, remaining)
+
+        items = self._items
+        if max_n is None or max_n >= len(items):
+            batch = list(items)
+            items.clear()
+        else:
+            batch = [items.popleft() for _ in range(max_n)]
+        self.gets += len(batch)
+        putters = self._putters
+        for _ in range(len(batch)):
+            if not putters:
+                break
+            self._wakeup(putters)
+        if items and self._getters:
+            self._wakeup(self._getters)
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except ChannelClosed:
+            raise StopAsyncIteration
+
+    def stats(self):
+        return {
+            "depth": len(self._items),
+            "maxsize": self.maxsize,
+            "puts": self.puts,
+            "gets": self.gets,
+            "producers": len(self._producers),
+            "closed": self.closed,
+        }
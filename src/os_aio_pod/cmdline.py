@@ -1,30 +1,134 @@
+import json
+import os
+from importlib import import_module
+from importlib.util import find_spec
+
 import click
 
 from os_aio_pod.utils import walk_modules
 
 from . import __version__
 
+CACHE_DIR = os.environ.get(
+    "OS_AIO_POD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "os-aio-pod"),
+)
+
+
+def package_stamp(locations):
+    """Newest mtime and number of modules under the package directories.
+
+    Adding, removing or editing a command module changes the stamp, no
+    module is imported.
+    """
+    newest, count = 0, 0
+    stack = list(locations)
+    while stack:
+        path = stack.pop()
+        newest = max(newest, os.stat(path).st_mtime_ns)
+        for entry in os.scandir(path):
+            if entry.name == "__pycache__":
+                continue
+            if entry.is_dir():
+                stack.append(entry.path)
+            elif entry.name.endswith(".py"):
+                newest = max(newest, entry.stat().st_mtime_ns)
+                count += 1
+    return [newest, count]
+
+
+class CommandIndex(object):
+    """Command name to module index of command packages.
+
+    Kept in a json file and rebuilt by importing the modules of a package
+    only when the package directories changed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, "commands.json")
+        self._index = None
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}"
+            with open(tmp, "w") as f:
+                json.dump(self._index, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+        self._dirty = False
+
+    def scan(self, command_package):
+        commands = {}
+        for cmd_module in walk_modules(command_package, skip_fail=False):
+            cli = getattr(cmd_module, "cli", None)
+            if isinstance(cli, click.Command):
+                commands[cmd_module.__name__.split(".")[-1]] = cmd_module.__name__
+        return commands
+
+    def commands(self, command_package):
+        if self._index is None:
+            self._index = self._load()
+        spec = find_spec(command_package)
+        locations = list(spec.submodule_search_locations or [])
+        stamp = package_stamp(locations) if locations else None
+        entry = self._index.get(command_package, None)
+        if (
+            stamp is None
+            or entry is None
+            or entry["locations"] != locations
+            or entry["stamp"] != stamp
+        ):
+            entry = {
+                "locations": locations,
+                "stamp": stamp,
+                "commands": self.scan(command_package),
+            }
+            self._index[command_package] = entry
+            self._dirty = True
+        return entry["commands"]
+
 
 class CommandFinder(click.MultiCommand):
+    """Find commands through the index, import only the invoked one."""
+
+    def __init__(self, *args, **kwargs):
+        super(CommandFinder, self).__init__(*args, **kwargs)
+        self.index = CommandIndex()
+        self._commands = None
+
     def list_commands(self, ctx):
         ctx.ensure_object(dict)
         return list(self.__find_commnds(**ctx.obj).keys())
 
     def get_command(self, ctx, name):
         ctx.ensure_object(dict)
-        commands = self.__find_commnds(**ctx.obj)
-        return commands.get(name, None)
+        module_name = self.__find_commnds(**ctx.obj).get(name, None)
+        if module_name is None:
+            return None
+        cli = getattr(import_module(module_name), "cli", None)
+        return cli if isinstance(cli, click.Command) else None
 
     def __find_commnds(self, **kwargs):
+        if self._commands is not None:
+            return self._commands
         command_packages = kwargs.get("command_packages", [])
         commands = {}
         for command_package in command_packages:
-            for cmd_module in walk_modules(command_package, skip_fail=False):
-                if hasattr(cmd_module, "cli") and isinstance(
-                    cmd_module.cli, click.Command
-                ):
-                    commands[cmd_module.__name__.split(".")[-1]] = cmd_module.cli
-
+            commands.update(self.index.commands(command_package))
+        self.index.save()
+        self._commands = commands
         return commands
 
 
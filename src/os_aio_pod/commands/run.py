@@ -3,22 +3,24 @@ import sys
 import click
 
 from os_aio_pod.config import LogLevel, LoopType, PodConfig
-from os_aio_pod.initializers import InitBeans, InitDebug, InitLog, InitLoop, InitSignal
-from os_aio_pod.pod import create
-from os_aio_pod.utils import (
-    load_core_config_from_pyfile,
-    parse_beans_arguments,
-    pydantic_dict,
-    update_from_bean_config_file,
-)
+from os_aio_pod.utils import load_pod_config, parse_beans_arguments
 
 DEFAULT_CONFIG = PodConfig()
 
 
-def run(config):
-    pod = create(
-        config, *[c() for c in [InitLoop, InitLog, InitBeans, InitDebug, InitSignal]]
+def run_pod(config):
+    from os_aio_pod.initializers import (
+        InitBeans,
+        InitDebug,
+        InitLagMonitor,
+        InitLog,
+        InitLoop,
+        InitSignal,
     )
+    from os_aio_pod.pod import create
+
+    initializers = [InitLoop, InitLog, InitBeans, InitDebug, InitLagMonitor, InitSignal]
+    pod = create(config, *[c() for c in initializers])
 
     loop = pod.loop
     try:
@@ -28,6 +30,17 @@ def run(config):
         loop.close()
 
 
+def run(config):
+    if config.WORKERS > 1:
+        from os_aio_pod.initializers import InitLog
+        from os_aio_pod.master import Master
+
+        InitLog().init(config, None)
+        Master(config, run_pod).run()
+    else:
+        run_pod(config)
+
+
 @click.command()
 @click.option("--debug", is_flag=True, help="Enable debug mode.")
 @click.option("-c", "--config-file", type=click.File(mode="r"), help="Config file.")
@@ -51,6 +64,12 @@ def run(config):
     type=click.INT,
     help=f"Stop wait time.",
 )
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    help=f"Number of worker processes.  [default: {DEFAULT_CONFIG.WORKERS}]",
+)
 @click.argument("BEANS", nargs=-1)
 @click.pass_context
 def cli(ctx, **kwargs):
@@ -58,26 +77,16 @@ def cli(ctx, **kwargs):
 
     ctx.ensure_object(dict)
 
-    config = DEFAULT_CONFIG.copy()
-    if "config_file" in kwargs and kwargs["config_file"]:
-        cfile = kwargs.pop("config_file")
-        config = load_core_config_from_pyfile(PodConfig, cfile.name)
-
+    config_file = kwargs.pop("config_file")
     if not kwargs["debug"]:
         kwargs.pop("debug")
 
-    config.BEANS.extend(parse_beans_arguments(kwargs.pop("beans")))
-
-    config = PodConfig(
-        **pydantic_dict(
-            config.copy(
-                update=dict(
-                    [(k.upper(), v) for k, v in kwargs.items() if v is not None]
-                )
-            )
-        )
+    config = load_pod_config(
+        PodConfig,
+        config_file.name if config_file else None,
+        parse_beans_arguments(kwargs.pop("beans")),
+        **kwargs,
     )
-    config = update_from_bean_config_file(config)
 
     if config.DEBUG:
         config = config.copy(update={"LOG_LEVEL": LogLevel.debug})
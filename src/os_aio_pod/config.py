@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseSettings
 
@@ -10,10 +10,20 @@ class StrEnum(str, Enum):
     """Enum where members are also (and must be) string"""
 
 
+class RestartPolicy(StrEnum):
+    never = "never"
+    on_failure = "on-failure"
+    always = "always"
+
+
 class BeanConfig(BaseSettings):
 
     label: str = None
     core: str
+    restart: RestartPolicy = RestartPolicy.never
+    max_restarts: int = None
+    backoff: float = 1.0
+    max_backoff: float = 60.0
 
     class Config:
         env_prefix = ENV_PREFIX
@@ -49,6 +59,13 @@ class PodConfig(BaseSettings):
     LOOP_TYPE: LoopType = list(LoopType)[0] if len(LoopType) == 1 else LoopType.auto
     DEBUG: bool = False
     STOP_WAIT_TIME: int = None
+    WORKERS: int = 1
+    WORKER_INDEX: int = 0
+    LAG_THRESHOLD: float = None
+    LAG_INTERVAL: float = None
+    BEAN_STATS: bool = False
+    EXECUTOR_THREADS: int = None
+    EXECUTORS: Dict[str, int] = {}
 
     class Config:
         env_prefix = ENV_PREFIX
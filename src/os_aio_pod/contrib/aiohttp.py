@@ -8,7 +8,7 @@ from typing import Any, Awaitable, Callable, List, Optional, Type, Union, cast
 from pydantic import BaseModel
 
 from os_aio_pod.bean import BeanContext
-from os_aio_pod.utils import module_from_string, pydantic_dict
+from os_aio_pod.utils import is_prefork, module_from_string, pydantic_dict
 
 try:
     from aiohttp import web
@@ -194,6 +194,8 @@ class WebAdapter(object):
             "sock",
         ):
             kwargs.pop(c, None)
+        if kwargs.get("reuse_port", None) is None:
+            kwargs["reuse_port"] = is_prefork(self.context.config)
         config = Config(**kwargs)
 
         loop = self.context.loop
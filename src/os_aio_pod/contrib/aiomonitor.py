@@ -1,6 +1,5 @@
 import asyncio
 import warnings
-from concurrent import futures
 
 from pydantic import BaseModel, Field
 
@@ -43,8 +42,7 @@ class AioMonitorAdapter(object):
         async def stop(**kwargs):
             if not stop_event.is_set() and not monitor.closed:
                 try:
-                    with futures.ThreadPoolExecutor() as pool:
-                        await loop.run_in_executor(pool, monitor.close)
+                    await self.context.run_in_thread(monitor.close)
                 finally:
                     stop_event.set()
 
@@ -0,0 +1,196 @@
+import asyncio
+import glob
+import mmap
+import os
+
+from os_aio_pod.contrib.pcflow import Server as BaseServer
+
+
+def expand_paths(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    expanded = []
+    for path in paths:
+        matched = sorted(glob.glob(path, recursive=True))
+        expanded.extend(matched if matched else [path])
+    return expanded
+
+
+def split_ranges(buf, start, end, num, separator=b"\n"):
+    """Split ``buf[start:end]`` into at most ``num`` ranges.
+
+    Each range but the last one ends right after a ``separator``.
+    """
+    step = (end - start) // num
+    ranges = []
+    pos = start
+    for i in range(1, num):
+        found = buf.find(separator, max(pos, start + step * i), end)
+        if found < 0:
+            break
+        found += len(separator)
+        if found >= end:
+            break
+        ranges.append((pos, found))
+        pos = found
+    ranges.append((pos, end))
+    return ranges
+
+
+def iter_records(buf, start, end, separator=b"\n", batch_size=1024):
+    """Yield lists of ``memoryview`` records of ``buf[start:end]``.
+
+    Records include the ``separator``, except a trailing one without it.
+    The end offset of each list is yielded with it.
+    """
+    view = memoryview(buf)
+    find = buf.find
+    step = len(separator)
+    records = []
+    pos = start
+    while pos < end:
+        found = find(separator, pos, end)
+        found = end if found < 0 else found + step
+        records.append(view[pos:found])
+        pos = found
+        if len(records) >= batch_size:
+            yield records, pos
+            records = []
+    if records:
+        yield records, pos
+
+
+def advise(buf, advice):
+    if hasattr(buf, "madvise") and hasattr(mmap, advice):
+        buf.madvise(getattr(mmap, advice))
+
+
+def close_map(buf):
+    try:
+        buf.close()
+    except BufferError:
+        # records still referenced, the map is closed when they are freed
+        pass
+
+
+class Server(BaseServer):
+    async def produce(self, **kwargs):
+        batch_lines = kwargs.get("batch_lines", False)
+        async for records in self.read_files(**kwargs):
+            if batch_lines:
+                yield records
+            else:
+                for record in records:
+                    yield record
+
+    async def read_files(self, **kwargs):
+        paths = expand_paths(kwargs.get("paths", []))
+        separator = kwargs.get("separator", b"\n")
+        if isinstance(separator, str):
+            separator = separator.encode()
+        ranges = kwargs.get("ranges", 1)
+        batch_size = kwargs.get("read_batch_size", 1024)
+
+        for path in paths:
+            if self.stopping:
+                break
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                offset = self.offsets.get(path, 0)
+                if isinstance(offset, int) and offset >= size:
+                    continue
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                async for records in self._read_file(
+                    path, buf, size, offset, ranges, separator, batch_size
+                ):
+                    yield records
+            finally:
+                close_map(buf)
+
+    async def _read_file(self, path, buf, size, offset, ranges, separator, batch_size):
+        if not isinstance(offset, int):
+            # ranges left unfinished by a stopped run
+            pending = [list(r) for r in offset]
+        elif ranges > 1:
+            pending = [
+                list(r) for r in split_ranges(buf, offset, size, ranges, separator)
+            ]
+        else:
+            reader = self._read_range(buf, offset, size, separator)
+            async for records, pos in reader(batch_size):
+                yield records
+                self.offsets[path] = pos
+            return
+
+        # the start of each range is moved to the end of its delivered
+        # records, the offset collapses to the size when all are done
+        self.offsets[path] = pending
+        reader = self._read_ranges(buf, pending, separator)
+        async for idx, records, pos in reader(batch_size):
+            yield records
+            pending[idx][0] = pos
+            left = [r for r in pending if r[0] < r[1]]
+            self.offsets[path] = left if left else size
+
+    def _read_range(self, buf, start, end, separator):
+        async def reader(batch_size):
+            advise(buf, "MADV_SEQUENTIAL")
+            for records, pos in iter_records(buf, start, end, separator, batch_size):
+                yield records, pos
+                if self.stopping:
+                    break
+
+        return reader
+
+    def _read_ranges(self, buf, ranges, separator):
+        async def reader(batch_size):
+            # a slot per range bounds the batches read ahead, the end of a
+            # range is put without one so a cancelled reader never waits
+            queue = asyncio.Queue()
+            slots = asyncio.Semaphore(len(ranges))
+            loop = self.context.loop
+
+            async def _read(idx, range_start, range_end):
+                try:
+                    for records, pos in iter_records(
+                        buf, range_start, range_end, separator, batch_size
+                    ):
+                        await slots.acquire()
+                        queue.put_nowait((idx, records, pos))
+                        if self.stopping:
+                            break
+                finally:
+                    queue.put_nowait(None)
+
+            advise(buf, "MADV_WILLNEED")
+            tasks = [
+                asyncio.ensure_future(_read(idx, *r), loop=loop)
+                for idx, r in enumerate(ranges)
+            ]
+            remaining = len(tasks)
+            try:
+                while remaining:
+                    item = await queue.get()
+                    if item is None:
+                        remaining -= 1
+                    else:
+                        slots.release()
+                        yield item
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+        return reader
+
+    async def run(self, **kwargs):
+        self.offsets = dict(kwargs.get("offsets", None) or {})
+        self.stopping = False
+
+        def _on_stop(**kwargs):
+            self.stopping = True
+
+        for signal in ("SIGTERM", "SIGINT"):
+            await self.context.add_signal_handler(signal, _on_stop)
+        return await super(Server, self).run(**kwargs)
@@ -4,8 +4,72 @@ import sys
 from os_aio_pod.contrib.pcflow import Server as BaseServer
 
 
+def split_lines(buf):
+    """Split ``buf`` into ``memoryview`` lines ending with ``\\n``.
+
+    Return the lines and the offset of the trailing partial line.
+    """
+    view = memoryview(buf)
+    find = buf.find
+    lines = []
+    start = 0
+    while True:
+        end = find(b"\n", start) + 1
+        if end == 0:
+            break
+        lines.append(view[start:end])
+        start = end
+    return lines, start
+
+
+async def read_chunk_lines(reader, chunk_size, stopping=None):
+    """Read ``chunk_size`` chunks from ``reader`` and yield lists of lines.
+
+    Lines are ``memoryview`` slices of the chunk, a partial trailing line
+    is kept for the next chunk, the last line is yielded at EOF even
+    without ``\\n``. There is no line length limit.
+    """
+    partial = []
+    while stopping is None or not stopping():
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        if partial:
+            # only the new chunk is searched, a long line is joined once
+            if chunk.find(b"\n") < 0:
+                partial.append(chunk)
+                continue
+            partial.append(chunk)
+            chunk = b"".join(partial)
+            partial = []
+        lines, end = split_lines(chunk)
+        if end < len(chunk):
+            partial.append(chunk[end:])
+        if lines:
+            yield lines
+    if partial:
+        yield [memoryview(b"".join(partial))]
+
+
 class Server(BaseServer):
     async def produce(self, **kwargs):
+        chunk_size = kwargs.get("chunk_size", None)
+        if chunk_size is None:
+            async for line in self._produce_lines():
+                yield line
+            return
+
+        batch_lines = kwargs.get("batch_lines", False)
+        async for lines in read_chunk_lines(
+            self.stdin, chunk_size, lambda: self.stopping
+        ):
+            if batch_lines:
+                yield lines
+            else:
+                for line in lines:
+                    yield line.tobytes()
+
+    async def _produce_lines(self):
         while not self.stopping:
             try:
                 yield await self.stdin.readuntil(b"\n")
@@ -16,7 +80,11 @@ class Server(BaseServer):
 
     async def run(self, **kwargs):
         loop = asyncio.get_event_loop()
-        reader = asyncio.StreamReader()
+        chunk_size = kwargs.get("chunk_size", None)
+        if chunk_size is None:
+            reader = asyncio.StreamReader()
+        else:
+            reader = asyncio.StreamReader(limit=chunk_size * 2)
         protocol = asyncio.StreamReaderProtocol(reader)
         await loop.connect_read_pipe(lambda: protocol, sys.stdin)
         self.stdin = reader
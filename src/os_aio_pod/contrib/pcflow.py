@@ -1,8 +1,121 @@
 import asyncio
+import os
 
 from os_aio_pod.contrib.simple import Server as BaseServer
 
 
+class Stop(object):
+    pass
+
+
+class BatchReader(object):
+    """Read lists of objects from a queue.
+
+    A batch is returned when it is full, when ``linger`` seconds passed
+    since its first object was read, or when a ``Stop`` is read.
+    """
+
+    def __init__(self, queue, batch_size, linger=0, loop=None):
+        self._queue = queue
+        self._batch_size = batch_size
+        self._linger = linger
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self._getter = None
+        self.stopped = False
+
+    async def read(self):
+        queue = self._queue
+        batch = []
+        deadline = None
+        while not self.stopped and len(batch) < self._batch_size:
+            if self._getter is None and not queue.empty():
+                obj = queue.get_nowait()
+            else:
+                timeout = None
+                if batch:
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                if self._getter is None:
+                    self._getter = asyncio.ensure_future(queue.get(), loop=self._loop)
+                done, _ = await asyncio.wait(
+                    [self._getter], timeout=timeout, loop=self._loop
+                )
+                if not done:
+                    break
+                obj = self._getter.result()
+                self._getter = None
+            if isinstance(obj, Stop):
+                self.stopped = True
+                break
+            if not batch:
+                deadline = self._loop.time() + self._linger
+            batch.append(obj)
+        return batch
+
+    @property
+    def idle(self):
+        return self._getter is None
+
+    def close(self):
+        if self._getter is not None:
+            self._getter.cancel()
+            self._getter = None
+
+
+class AIMDLimiter(object):
+    """Additive increase, multiplicative decrease concurrency limiter.
+
+    On each ``update`` the limit grows by one while objects are waiting
+    and the average consume latency stays within ``tolerance`` times the
+    baseline latency, it is multiplied by ``backoff_ratio`` when latency
+    exceeds that. The baseline is the lowest latency seen, it drifts up
+    by ``baseline_drift`` per update so it follows lasting changes of the
+    downstream.
+    """
+
+    def __init__(
+        self,
+        min_limit,
+        max_limit,
+        tolerance=2.0,
+        backoff_ratio=0.9,
+        baseline_drift=0.05,
+    ):
+        assert 1 <= min_limit <= max_limit, f"Invalid limits {min_limit} {max_limit}"
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff_ratio = backoff_ratio
+        self.baseline_drift = baseline_drift
+        self.limit = min_limit
+        self.latency = None
+        self.baseline = None
+        self._count = 0
+        self._total = 0.0
+
+    def record(self, latency):
+        self._count += 1
+        self._total += latency
+
+    def update(self, queue_depth):
+        if self._count == 0:
+            return self.limit
+        latency = self._total / self._count
+        self._count, self._total = 0, 0.0
+        self.latency = latency
+        if self.baseline is None:
+            self.baseline = latency
+        else:
+            self.baseline = min(latency, self.baseline * (1 + self.baseline_drift))
+
+        if latency > self.baseline * self.tolerance:
+            self.limit = max(self.min_limit, int(self.limit * self.backoff_ratio))
+        elif queue_depth > 0:
+            self.limit = min(self.max_limit, self.limit + 1)
+        return self.limit
+
+
 class Server(BaseServer):
     async def produce(self, **kwargs):
         pass
@@ -10,29 +123,315 @@ class Server(BaseServer):
     async def consume(self, obj, **kwargs):
         pass
 
+    async def consume_batch(self, objs, **kwargs):
+        for obj in objs:
+            await self.consume(obj, **kwargs)
+
+    @classmethod
+    def consume_sync(cls, obj):
+        pass
+
+    @classmethod
+    def consume_batch_sync(cls, objs):
+        return [cls.consume_sync(obj) for obj in objs]
+
+    async def on_consumed(self, objs, results, **kwargs):
+        pass
+
     async def run(self, **kwargs):
         await super(Server, self).run(**kwargs)
 
+        loop = self.context.loop
         consumer_num = kwargs.get("consumer_num", 10)
         queue_size = kwargs.get("queue_size", 10)
+        batch_size = kwargs.get("batch_size", None)
+        linger = kwargs.get("linger_ms", 0) / 1000
+        max_consumers = kwargs.get("max_consumers", None)
+        adjust_interval = kwargs.get("adjust_interval", 1.0)
+        executor = kwargs.get("executor", None)
+        assert executor in (None, "process"), f"Unsupported executor {executor}"
         queue = asyncio.Queue(maxsize=queue_size)
 
-        class Stop:
-            pass
+        pool = None
+        if executor == "process":
+            workers = kwargs.get("workers", None) or os.cpu_count()
+            pool = self.context.process_pool(workers)
+            consumer_num = kwargs.get("consumer_num", workers)
+            if batch_size is None:
+                batch_size = kwargs.get("chunk_size", 16)
+
+        self.limiter = None
+        if max_consumers is not None:
+            self.limiter = AIMDLimiter(
+                kwargs.get("min_consumers", 1),
+                max_consumers,
+                tolerance=kwargs.get("latency_tolerance", 2.0),
+            )
+            consumer_num = self.limiter.limit
+        self.consumers = 0
+        metrics = self.context.metrics
+        metrics.gauge("pcflow_queue_size", "Objects in the queue").set_function(
+            queue.qsize
+        )
+        metrics.gauge("pcflow_consumers", "Running consumers").set_function(
+            lambda: self.consumers
+        )
+        limiter = self.limiter
+        produced = False
+
+        def scale_down():
+            return limiter is not None and self.consumers > limiter.limit
 
         async def _consume():
-            while True:
+            while not scale_down():
                 obj = await queue.get()
                 if isinstance(obj, Stop):
+                    queue.put_nowait(obj)
                     break
+                start = loop.time()
                 await self.consume(obj, **kwargs)
+                if limiter is not None:
+                    limiter.record(loop.time() - start)
+
+        async def _handle_batch(objs):
+            await self.consume_batch(objs, **kwargs)
+
+        async def _handle_batch_process(objs):
+            results = await loop.run_in_executor(
+                pool, self.__class__.consume_batch_sync, objs
+            )
+            await self.on_consumed(objs, results, **kwargs)
+
+        handle = _handle_batch if pool is None else _handle_batch_process
+
+        async def _consume_batch():
+            reader = BatchReader(queue, batch_size, linger, loop)
+            try:
+                while not reader.stopped and not (reader.idle and scale_down()):
+                    objs = await reader.read()
+                    if objs:
+                        start = loop.time()
+                        await handle(objs)
+                        if limiter is not None:
+                            limiter.record(loop.time() - start)
+                if reader.stopped:
+                    queue.put_nowait(Stop())
+            finally:
+                reader.close()
+
+        consume = _consume if batch_size is None else _consume_batch
+
+        async def _worker():
+            try:
+                await consume()
+            finally:
+                self.consumers -= 1
+
+        workers = set()
+
+        def add_worker():
+            self.consumers += 1
+            task = asyncio.ensure_future(_worker(), loop=loop)
+            workers.add(task)
+            task.add_done_callback(workers.discard)
 
         async def _produce():
-            async for obj in self.produce(**kwargs):
-                await queue.put(obj)
-            for _ in range(consumer_num):
+            nonlocal produced
+            try:
+                async for obj in self.produce(**kwargs):
+                    await queue.put(obj)
+            finally:
                 await queue.put(Stop())
+                produced = True
+
+        async def _adjust():
+            while not produced:
+                await asyncio.sleep(adjust_interval, loop=loop)
+                limit = limiter.update(queue.qsize())
+                while not produced and self.consumers < limit:
+                    add_worker()
+
+        for _ in range(consumer_num):
+            add_worker()
+        tasks = [asyncio.ensure_future(_produce(), loop=loop)]
+        if limiter is not None:
+            tasks.append(asyncio.ensure_future(_adjust(), loop=loop))
+
+        try:
+            await tasks[0]
+            while workers:
+                await asyncio.wait(list(workers), loop=loop)
+        finally:
+            for task in tasks + list(workers):
+                if not task.done():
+                    task.cancel()
+
+
+class Stage(object):
+    """One step of a ``Pipeline``.
+
+    ``func`` is called with each object, or with lists of objects when
+    ``batch_size`` is set, and its results are put to ``output``. A
+    ``None`` result is dropped, a batch function returns a list.
+    """
+
+    def __init__(
+        self,
+        name,
+        func,
+        consumer_num=1,
+        queue_size=10,
+        batch_size=None,
+        linger=0,
+        loop=None,
+    ):
+        self.name = name
+        self.func = func
+        self.consumer_num = consumer_num
+        self.batch_size = batch_size
+        self.linger = linger
+        self.loop = loop if loop else asyncio.get_event_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.received = 0
+        self.emitted = 0
+        self.busy = 0.0
+        self.started = None
+        self.finished = None
+
+    def stats(self):
+        end = self.finished if self.finished else self.loop.time()
+        elapsed = end - self.started if self.started else 0
+        return {
+            "received": self.received,
+            "emitted": self.emitted,
+            "queue_size": 0 if self.finished else self.queue.qsize(),
+            "busy": self.busy,
+            "throughput": self.received / elapsed if elapsed > 0 else 0,
+        }
+
+    async def _emit(self, output, results):
+        for result in results:
+            if result is not None:
+                self.emitted += 1
+                if output is not None:
+                    await output.put(result)
+
+    async def _call(self, output, objs):
+        start = self.loop.time()
+        if self.batch_size is None:
+            results = [await self.func(objs[0])]
+        else:
+            results = await self.func(objs)
+        self.busy += self.loop.time() - start
+        self.received += len(objs)
+        if results:
+            await self._emit(output, results)
+
+    async def _consume(self, output):
+        while True:
+            obj = await self.queue.get()
+            if isinstance(obj, Stop):
+                self.queue.put_nowait(obj)
+                break
+            await self._call(output, [obj])
+
+    async def _consume_batch(self, output):
+        reader = BatchReader(self.queue, self.batch_size, self.linger, self.loop)
+        try:
+            while not reader.stopped:
+                objs = await reader.read()
+                if objs:
+                    await self._call(output, objs)
+            self.queue.put_nowait(Stop())
+        finally:
+            reader.close()
+
+    async def run(self, output=None):
+        self.started = self.loop.time()
+        consume = self._consume if self.batch_size is None else self._consume_batch
+        tasks = [
+            asyncio.ensure_future(consume(output), loop=self.loop)
+            for _ in range(self.consumer_num)
+        ]
+        try:
+            await asyncio.gather(*tasks, loop=self.loop)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            self.finished = self.loop.time()
+        if output is not None:
+            await output.put(Stop())
+
+
+class Pipeline(BaseServer):
+    """Run objects from ``produce`` through a chain of stages.
+
+    ``stages`` is a list of dicts, ``name`` is the coroutine method called
+    for the stage, ``consumer_num``, ``queue_size``, ``batch_size`` and
+    ``linger_ms`` configure it like ``Server``.
+    """
+
+    stages = []
+
+    async def produce(self, **kwargs):
+        pass
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self._stages}
+
+    async def _report(self, interval):
+        while True:
+            await asyncio.sleep(interval, loop=self.context.loop)
+            self.logger.info(f"Pipeline stats {self.stats()}")
+
+    async def run(self, **kwargs):
+        await super(Pipeline, self).run(**kwargs)
+
+        loop = self.context.loop
+        stages_config = kwargs.get("stages", self.stages)
+        assert stages_config, "No stages"
+        stats_interval = kwargs.get("stats_interval", None)
+
+        self._stages = [
+            Stage(
+                conf["name"],
+                getattr(self, conf["name"]),
+                consumer_num=conf.get("consumer_num", 1),
+                queue_size=conf.get("queue_size", 10),
+                batch_size=conf.get("batch_size", None),
+                linger=conf.get("linger_ms", 0) / 1000,
+                loop=loop,
+            )
+            for conf in stages_config
+        ]
+        stages = self._stages
+        head = stages[0].queue
+        metrics = self.context.metrics
+        for stage in stages:
+            gauge = metrics.gauge(
+                "pcflow_stage_queue_size", "Objects in stage queue", stage=stage.name
+            )
+            gauge.set_function(stage.queue.qsize)
+
+        async def _produce():
+            try:
+                async for obj in self.produce(**kwargs):
+                    await head.put(obj)
+            finally:
+                await head.put(Stop())
 
-        tasks = [_produce()] + [_consume() for _ in range(consumer_num)]
+        tasks = [asyncio.ensure_future(_produce(), loop=loop)]
+        for stage, downstream in zip(stages, stages[1:] + [None]):
+            output = downstream.queue if downstream is not None else None
+            tasks.append(asyncio.ensure_future(stage.run(output), loop=loop))
+        reporter = None
+        if stats_interval:
+            reporter = asyncio.ensure_future(self._report(stats_interval), loop=loop)
 
-        await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
+        try:
+            await asyncio.gather(*tasks, loop=loop)
+        finally:
+            for task in tasks + [reporter]:
+                if task is not None and not task.done():
+                    task.cancel()
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+from pydantic import BaseModel
+
+from os_aio_pod.monitor import current_task
+
+
+class Sampler(object):
+    """Sample the stacks of all threads from a background thread.
+
+    Stacks are collapsed root first, the loop thread's stacks get the
+    running bean as an extra root frame.
+    """
+
+    def __init__(self, loop, rate=100):
+        self.loop = loop
+        self.interval = 1.0 / rate
+        self.samples = Counter()
+        self.started = None
+        self._names = {}
+        self._loop_thread = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        self.samples = Counter()
+        self.started = time.time()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="Sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+        return self.samples
+
+    def _name(self, code):
+        name = self._names.get(code, None)
+        if name is None:
+            filename = os.path.basename(code.co_filename)
+            name = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._names[code] = name
+        return name
+
+    def _bean(self):
+        task = current_task(self.loop)
+        if task is None:
+            return "loop"
+        context = getattr(task, "context", None)
+        if context is None:
+            return "task"
+        return f"bean-{context.id}-{context.label}"
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stopped.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._name(frame.f_code))
+                    frame = frame.f_back
+                if ident == self._loop_thread:
+                    stack.append(self._bean())
+                stack.append(names.get(ident, str(ident)))
+                stack.reverse()
+                self.samples[";".join(stack)] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Config(BaseModel):
+
+    rate: int = 100
+    output: str = "profile-{pid}-{time}.collapsed"
+    duration: float = None
+    start: bool = False
+    os_signal: str = "SIGUSR2"
+    start_signal: str = "PROFILE_START"
+    stop_signal: str = "PROFILE_STOP"
+
+
+class ProfilerAdapter(object):
+    """Sampling profiler started and stopped by signals.
+
+    Writes collapsed stacks for flamegraph tools to ``output`` when
+    stopped.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.config = None
+        self.sampler = None
+        self._timer = None
+
+    def start(self, duration=None):
+        if self.sampler.running:
+            return
+        self.sampler.start()
+        self.logger.info(f"Profiling started, rate: {self.config.rate}")
+        duration = duration if duration is not None else self.config.duration
+        if duration:
+            self._timer = self.context.loop.call_later(duration, self.stop)
+
+    def stop(self):
+        if not self.sampler.running:
+            return None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        samples = self.sampler.stop()
+        path = self.config.output.format(
+            pid=os.getpid(), time=int(self.sampler.started)
+        )
+        self.sampler.write(path)
+        self.logger.info(f"Profiling stopped, {sum(samples.values())} samples: {path}")
+        return path
+
+    def toggle(self):
+        if self.sampler.running:
+            self.stop()
+        else:
+            self.start()
+
+    async def __call__(self, **kwargs):
+        self.config = config = Config(**kwargs)
+        loop = self.context.loop
+        self.sampler = Sampler(loop, config.rate)
+
+        async def on_start(**kwargs):
+            self.start(kwargs.get("duration", None))
+
+        async def on_stop(**kwargs):
+            return self.stop()
+
+        await self.context.add_signal_handler(config.start_signal, on_start)
+        await self.context.add_signal_handler(config.stop_signal, on_stop)
+
+        os_signal = None
+        if config.os_signal:
+            os_signal = getattr(signal, config.os_signal)
+            loop.add_signal_handler(os_signal, self.toggle)
+
+        if config.start:
+            self.start()
+
+        stop_event = asyncio.Event(loop=loop)
+
+        async def stop(**kwargs):
+            stop_event.set()
+
+        for sig in ("SIGINT", "SIGTERM"):
+            await self.context.add_signal_handler(sig, stop)
+
+        try:
+            await stop_event.wait()
+        finally:
+            if os_signal is not None:
+                loop.remove_signal_handler(os_signal)
+            self.stop()
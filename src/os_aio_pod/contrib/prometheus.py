@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from pydantic import BaseModel
+
+from os_aio_pod.utils import is_prefork
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Config(BaseModel):
+
+    host: str = "127.0.0.1"
+    port: int = 9398
+    path: str = "/metrics"
+
+
+class PrometheusAdapter(object):
+    """Serve the pod metrics registry in Prometheus text format.
+
+    Each worker has its own registry in prefork mode, the worker of index
+    ``i`` serves it on ``port + i``.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path = None
+
+    def response(self, request):
+        line = request.split(b"\r\n", 1)[0].split()
+        if len(line) < 2 or line[0] not in (b"GET", b"HEAD"):
+            return "405 Method Not Allowed", b""
+        if line[1].split(b"?", 1)[0].decode() != self.path:
+            return "404 Not Found", b""
+        body = self.context.pod.metrics.render().encode()
+        return "200 OK", b"" if line[0] == b"HEAD" else body
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            status, body = self.response(request)
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: {CONTENT_TYPE}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except Exception as e:
+            self.logger.error(f"Metrics request error {e!r}")
+        finally:
+            writer.close()
+
+    async def __call__(self, **kwargs):
+        config = Config(**kwargs)
+        if is_prefork(self.context.config):
+            config.port += self.context.config.WORKER_INDEX
+        self.path = config.path
+        loop = self.context.loop
+
+        server = await asyncio.start_server(
+            self.handle, config.host, config.port, loop=loop
+        )
+        self.logger.debug(f"Serving metrics on {config.host}:{config.port}")
+
+        stop_event = asyncio.Event(loop=loop)
+
+        async def stop(**kwargs):
+            if not stop_event.is_set():
+                try:
+                    server.close()
+                    await server.wait_closed()
+                finally:
+                    stop_event.set()
+
+        for sig in ("SIGINT", "SIGTERM"):
+            await self.context.add_signal_handler(sig, stop)
+
+        await stop_event.wait()
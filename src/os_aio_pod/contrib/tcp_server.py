@@ -1,10 +1,14 @@
 import asyncio
 import logging
+import struct
 from asyncio.streams import _DEFAULT_LIMIT
 
 from pydantic import BaseModel, Field
 
-from os_aio_pod.utils import module_from_string
+from os_aio_pod.config import StrEnum
+from os_aio_pod.utils import is_prefork, module_from_string
+
+DEFAULT_MAX_FRAME_SIZE = 1 << 20
 
 
 class Server(object):
@@ -18,6 +22,28 @@ class Server(object):
     async def on_connect(self, reader, writer):
         pass
 
+    def on_connection_made(self, protocol):
+        pass
+
+    def on_data(self, protocol, data):
+        """Called in buffered mode with a memoryview of the unparsed bytes.
+
+        Return the number of bytes parsed, the rest is passed again with
+        the next received bytes. The memoryview is only valid in the call.
+        """
+        return len(data)
+
+    def on_frame(self, protocol, frame):
+        """Called with a memoryview of each frame when a codec is configured.
+
+        The memoryview is only valid in the call, reply with
+        ``protocol.send(frame)``.
+        """
+        pass
+
+    def on_connection_lost(self, protocol, exc):
+        pass
+
     async def on_setup(self):
         pass
 
@@ -31,6 +57,426 @@ class Server(object):
         pass
 
 
+class BufferedServerProtocol(asyncio.BufferedProtocol):
+    """Receive into a reused buffer and pass it to ``Server.on_data``.
+
+    The buffer grows when unparsed bytes fill it, buffers of closed
+    connections are kept in ``pool`` for new connections.
+    """
+
+    def __init__(self, server, buffer_size, pool):
+        self.server = server
+        self.transport = None
+        self._pool = pool
+        self._buffer_size = buffer_size
+        self._buffer = pool.pop() if pool else bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._end = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.on_connection_made(self)
+
+    def get_buffer(self, sizehint):
+        if self._end == len(self._buffer):
+            self._view.release()
+            self._buffer.extend(bytes(len(self._buffer)))
+            self._view = memoryview(self._buffer)
+        return self._view[self._end :]
+
+    def buffer_updated(self, nbytes):
+        end = self._end + nbytes
+        data = self._view[:end]
+        try:
+            parsed = self.server.on_data(self, data)
+        finally:
+            data.release()
+        self._compact(parsed, end)
+
+    def _compact(self, parsed, end):
+        if parsed >= end:
+            self._end = 0
+        else:
+            # memoryview assignment moves overlapping bytes safely
+            self._view[: end - parsed] = self._view[parsed:end]
+            self._end = end - parsed
+
+    def connection_lost(self, exc):
+        try:
+            self.server.on_connection_lost(self, exc)
+        finally:
+            self.transport = None
+            self._end = 0
+            self._view.release()
+            # shrink a buffer grown for a large frame before pooling it
+            del self._buffer[self._buffer_size :]
+            self._pool.append(self._buffer)
+
+
+class LengthCodec(object):
+    """Frames prefixed with their length in ``length_size`` bytes."""
+
+    def __init__(
+        self, length_size=4, byteorder="big", max_frame_size=DEFAULT_MAX_FRAME_SIZE
+    ):
+        self.length_size = length_size
+        self.byteorder = byteorder
+        self.max_frame_size = max_frame_size
+        fmt = {1: "B", 2: "H", 4: "I", 8: "Q"}.get(length_size)
+        self._struct = None
+        if fmt is not None:
+            self._struct = struct.Struct((">" if byteorder == "big" else "<") + fmt)
+
+    def _length(self, view, pos):
+        if self._struct is not None:
+            return self._struct.unpack_from(view, pos)[0]
+        return int.from_bytes(view[pos : pos + self.length_size], self.byteorder)
+
+    def decode(self, buffer, view, end, searched=0):
+        frames = []
+        size = self.length_size
+        pos = 0
+        while end - pos >= size:
+            length = self._length(view, pos)
+            if self.max_frame_size is not None and length > self.max_frame_size:
+                raise ValueError(f"Frame too large {length}")
+            start = pos + size
+            if end - start < length:
+                break
+            pos = start + length
+            frames.append(view[start:pos])
+        return frames, pos
+
+    def encode(self, frame):
+        return [len(frame).to_bytes(self.length_size, self.byteorder), frame]
+
+
+class DelimiterCodec(object):
+    """Frames ended with ``delimiter``, which is not part of the frame."""
+
+    def __init__(self, delimiter=b"\n", max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+        self.delimiter = delimiter
+        self.max_frame_size = max_frame_size
+
+    def decode(self, buffer, view, end, searched=0):
+        frames = []
+        find = buffer.find
+        step = len(self.delimiter)
+        pos = 0
+        # the first searched bytes hold no delimiter but may end with a part
+        start = max(searched - step + 1, 0)
+        while True:
+            found = find(self.delimiter, start, end)
+            if found < 0:
+                break
+            frames.append(view[pos:found])
+            pos = start = found + step
+        if self.max_frame_size is not None and end - pos > self.max_frame_size:
+            raise ValueError(f"Frame too large {end - pos}")
+        return frames, pos
+
+    def encode(self, frame):
+        return [frame, self.delimiter]
+
+
+class FixedCodec(object):
+    """Frames of ``frame_size`` bytes."""
+
+    def __init__(self, frame_size):
+        self.frame_size = frame_size
+
+    def decode(self, buffer, view, end, searched=0):
+        size = self.frame_size
+        stop = end - end % size
+        return [view[pos : pos + size] for pos in range(0, stop, size)], stop
+
+    def encode(self, frame):
+        return [frame]
+
+
+class CodecType(StrEnum):
+    length = "length"
+    delimiter = "delimiter"
+    fixed = "fixed"
+
+
+def create_codec(config):
+    if config.codec == CodecType.length:
+        return LengthCodec(config.length_size, config.byteorder, config.max_frame_size)
+    elif config.codec == CodecType.delimiter:
+        return DelimiterCodec(config.delimiter, config.max_frame_size)
+    assert config.frame_size, "frame_size is required by the fixed codec"
+    return FixedCodec(config.frame_size)
+
+
+class FramedServerProtocol(BufferedServerProtocol):
+    """Decode frames in the receive buffer and pass them to ``Server.on_frame``.
+
+    Frames sent with ``send`` are written together with ``writelines``
+    after the received data is handled, or in the next loop iteration.
+    """
+
+    def __init__(self, server, buffer_size, pool, codec, loop):
+        super(FramedServerProtocol, self).__init__(server, buffer_size, pool)
+        self.codec = codec
+        self._loop = loop
+        self._out = []
+        self._flushing = False
+
+    def buffer_updated(self, nbytes):
+        # the bytes kept from the previous call hold no complete frame
+        end = self._end + nbytes
+        frames, parsed = self.codec.decode(self._buffer, self._view, end, self._end)
+        try:
+            on_frame = self.server.on_frame
+            for frame in frames:
+                on_frame(self, frame)
+        finally:
+            for frame in frames:
+                frame.release()
+        self._compact(parsed, end)
+        self.flush()
+
+    def send(self, frame):
+        if isinstance(frame, memoryview):
+            frame = frame.tobytes()
+        self._out.extend(self.codec.encode(frame))
+        if not self._flushing:
+            self._flushing = True
+            self._loop.call_soon(self.flush)
+
+    def flush(self):
+        self._flushing = False
+        if self._out and self.transport is not None:
+            self.transport.writelines(self._out)
+            self._out = []
+
+
+class Connections(object):
+    """Admission control and timeouts of the connections of a server.
+
+    Connections accepted while ``max_connections`` connections are open
+    are closed at once and counted as rejected. ``drain`` closes
+    connections when their handler tasks are done.
+    """
+
+    def __init__(self, config, loop):
+        self.config = config
+        self.loop = loop
+        self.draining = False
+        self.protocols = set()
+        self.tasks = set()
+        self._drained = None
+        self.live = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def stats(self):
+        return {
+            "live": self.live,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def wrap(self, factory, buffered=False):
+        cls = TrackedBufferedProtocol if buffered else TrackedProtocol
+        return lambda: cls(self, factory())
+
+    def admit(self, protocol, transport):
+        max_connections = self.config.max_connections
+        if self.draining or (
+            max_connections is not None and self.live >= max_connections
+        ):
+            self.rejected += 1
+            return False
+        self.protocols.add(protocol)
+        self.live += 1
+        self.accepted += 1
+        high = self.config.write_high_watermark
+        if high is not None:
+            transport.set_write_buffer_limits(high, self.config.write_low_watermark)
+        return True
+
+    def release(self, protocol):
+        self.protocols.discard(protocol)
+        self.live -= 1
+        self._check_drained()
+
+    def track(self, protocol, task, on_drain=None):
+        self.tasks.add(task)
+        protocol.tasks.add(task)
+        task.add_done_callback(lambda task: self._task_done(protocol, task))
+        if on_drain is not None:
+            protocol.on_drain.append(on_drain)
+            if self.draining:
+                on_drain()
+
+    def _task_done(self, protocol, task):
+        self.tasks.discard(task)
+        protocol.tasks.discard(task)
+        if self.draining:
+            protocol.close_if_idle()
+            self._check_drained()
+
+    def _check_drained(self):
+        if self.draining and self._drained is not None:
+            if self.live == 0 and not self.tasks:
+                self._drained.set()
+
+    async def drain(self, timeout=None):
+        """Close idle connections, then the others when their tasks are done.
+
+        Connections still open after ``timeout`` seconds are aborted and
+        their tasks cancelled.
+        """
+        self.draining = True
+        for protocol in list(self.protocols):
+            protocol.drain()
+        if self.live == 0 and not self.tasks:
+            return
+        self._drained = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            for protocol in list(self.protocols):
+                protocol.abort()
+            tasks = list(self.tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TrackedTransport(object):
+    """Transport proxy which tracks the tasks handling its connection.
+
+    Protocols handling data in tasks pass them to ``track``, a draining
+    connection is closed when its tracked tasks are done.
+    """
+
+    def __init__(self, protocol, transport):
+        self._protocol = protocol
+        self._transport = transport
+
+    def __getattr__(self, name):
+        return getattr(self._transport, name)
+
+    def track(self, task, on_drain=None):
+        """Track a task handling the connection.
+
+        ``on_drain`` is called when the server starts draining, to end the
+        input of the task.
+        """
+        self._protocol.connections.track(self._protocol, task, on_drain)
+        return task
+
+
+class TrackedProtocol(asyncio.Protocol):
+    """Apply ``Connections`` admission and timeouts to a protocol.
+
+    A connection is idle when none of its tracked tasks is running.
+    """
+
+    def __init__(self, connections, protocol):
+        self.connections = connections
+        self.protocol = protocol
+        self.transport = None
+        self.last_read = None
+        self.tasks = set()
+        self.on_drain = []
+        self._timer = None
+
+    def connection_made(self, transport):
+        if not self.connections.admit(self, transport):
+            transport.abort()
+            return
+        self.transport = transport
+        self.last_read = self.connections.loop.time()
+        self._schedule()
+        self.protocol.connection_made(TrackedTransport(self, transport))
+
+    def drain(self):
+        if self.transport is None:
+            return
+        if self.tasks:
+            self.transport.pause_reading()
+            for on_drain in self.on_drain:
+                on_drain()
+        else:
+            self.transport.close()
+
+    def close_if_idle(self):
+        if self.transport is not None and not self.tasks:
+            self.transport.close()
+
+    def abort(self):
+        if self.transport is not None:
+            self.transport.abort()
+
+    def _timeouts(self):
+        config = self.connections.config
+        return [t for t in (config.idle_timeout, config.read_timeout) if t]
+
+    def _schedule(self):
+        timeouts = self._timeouts()
+        if timeouts:
+            self._timer = self.connections.loop.call_at(
+                self.last_read + min(timeouts), self._check
+            )
+
+    def _check(self):
+        self._timer = None
+        if self.transport is None:
+            return
+        config = self.connections.config
+        elapsed = self.connections.loop.time() - self.last_read
+        expired = config.read_timeout and elapsed >= config.read_timeout
+        if not expired and config.idle_timeout and elapsed >= config.idle_timeout:
+            expired = not self.tasks and self.transport.get_write_buffer_size() == 0
+        if expired:
+            self.connections.timed_out += 1
+            self.transport.abort()
+            return
+        timeouts = [t for t in self._timeouts() if t > elapsed]
+        delay = min(timeouts) - elapsed if timeouts else config.idle_timeout
+        self._timer = self.connections.loop.call_later(delay, self._check)
+
+    def data_received(self, data):
+        self.last_read = self.connections.loop.time()
+        self.protocol.data_received(data)
+
+    def eof_received(self):
+        return self.protocol.eof_received()
+
+    def pause_writing(self):
+        self.protocol.pause_writing()
+
+    def resume_writing(self):
+        self.protocol.resume_writing()
+
+    def connection_lost(self, exc):
+        if self.transport is None:
+            return
+        self.transport = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        try:
+            self.protocol.connection_lost(exc)
+        finally:
+            self.connections.release(self)
+
+
+class TrackedBufferedProtocol(TrackedProtocol, asyncio.BufferedProtocol):
+    def get_buffer(self, sizehint):
+        return self.protocol.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self.last_read = self.connections.loop.time()
+        self.protocol.buffer_updated(nbytes)
+
+
 class Config(BaseModel):
 
     host: str = "127.0.0.1"
@@ -38,6 +484,21 @@ class Config(BaseModel):
     protocol: module_from_string(asyncio.Protocol) = None
     backlog: int = 100
     limit: int = _DEFAULT_LIMIT
+    buffered: bool = False
+    buffer_size: int = 65536
+    codec: CodecType = None
+    length_size: int = 4
+    byteorder: str = "big"
+    delimiter: bytes = b"\n"
+    frame_size: int = None
+    max_frame_size: int = DEFAULT_MAX_FRAME_SIZE
+    max_connections: int = None
+    write_high_watermark: int = None
+    write_low_watermark: int = None
+    idle_timeout: float = None
+    read_timeout: float = None
+    drain_timeout: float = None
+    reuse_port: bool = None
     server: module_from_string(Server) = Field(Server, validate_always=True)
 
     class Config:
@@ -49,6 +510,19 @@ class TCPServerAdapter(object):
         self.context = context
         self.logger = logging.getLogger(self.__class__.__name__)
         self.server = None
+        self.connections = None
+
+    def stats(self):
+        return self.connections.stats() if self.connections else {}
+
+    def register_metrics(self, metrics, connections):
+        metrics.gauge("tcp_connections", "Open connections").set_function(
+            lambda: connections.live
+        )
+        for name in ("accepted", "rejected", "timed_out"):
+            metrics.counter(
+                f"tcp_connections_{name}_total", f"Connections {name}"
+            ).set_function(lambda name=name: getattr(connections, name))
 
     async def add_stop_signal_handler(self, callback):
         for sig in ("SIGINT", "SIGTERM"):
@@ -60,22 +534,48 @@ class TCPServerAdapter(object):
 
     def create(self, config, loop):
         tcp_server = config.server(self.context, config)
+        self.connections = Connections(config, loop)
+
+        buffered = config.buffered or config.codec is not None
+        if config.codec is not None:
+            pool = []
+            codec = create_codec(config)
+
+            def protocol_factory():
+                return FramedServerProtocol(
+                    tcp_server, config.buffer_size, pool, codec, loop
+                )
+
+        elif config.buffered:
+            pool = []
+
+            def protocol_factory():
+                return BufferedServerProtocol(tcp_server, config.buffer_size, pool)
+
+        elif config.protocol is None:
+
+            def on_connect(reader, writer):
+                # the handler reads up to the end of the buffered data on drain
+                writer.transport.track(
+                    loop.create_task(tcp_server.on_connect(reader, writer)),
+                    reader.feed_eof,
+                )
+
+            def protocol_factory():
+                reader = asyncio.StreamReader(limit=config.limit, loop=loop)
+                return asyncio.StreamReaderProtocol(reader, on_connect, loop=loop)
 
-        factory = None
-        if config.protocol is None:
-            factory = asyncio.start_server(
-                tcp_server.on_connect,
-                config.host,
-                config.port,
-                backlog=config.backlog,
-                limit=config.limit,
-                loop=loop,
-            )
         else:
             config.protocol.server = tcp_server
-            factory = loop.create_server(
-                config.protocol, config.host, config.port, backlog=config.backlog
-            )
+            protocol_factory = config.protocol
+
+        factory = loop.create_server(
+            self.connections.wrap(protocol_factory, buffered),
+            config.host,
+            config.port,
+            backlog=config.backlog,
+            reuse_port=config.reuse_port,
+        )
 
         return tcp_server, factory
 
@@ -100,10 +600,13 @@ class TCPServerAdapter(object):
 
     async def __call__(self, **kwargs):
         config = Config(**kwargs)
+        if config.reuse_port is None:
+            config.reuse_port = is_prefork(self.context.config)
         loop = self.context.loop
 
         tcp_server, factory = self.create(config, loop)
         self.server = tcp_server
+        self.register_metrics(self.context.metrics, self.connections)
 
         await self.wait(tcp_server, "on_setup", loop)
 
@@ -122,6 +625,7 @@ class TCPServerAdapter(object):
                     try:
                         await tcp_server.on_stop()
                         server.close()
+                        await self.connections.drain(config.drain_timeout)
                         await server.wait_closed()
                     finally:
                         stop_event.set()
@@ -1,6 +1,9 @@
 import os
+import socket
 import warnings
 
+from os_aio_pod.utils import is_prefork
+
 try:
     from uvicorn.config import Config
     from uvicorn.main import Server as BaseServer
@@ -9,15 +12,24 @@ except:
     raise
 
 
+def bind_reuse_port_socket(config):
+    family = socket.AF_INET6 if ":" in config.host else socket.AF_INET
+    sock = socket.socket(family=family)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((config.host, config.port))
+    return sock
+
+
 class Server(BaseServer):
     def __init__(self, config, context):
         super(Server, self).__init__(config)
         self.context = context
 
-    async def run(self):
-        await self.serve()
+    async def run(self, sockets=None):
+        await self.serve(sockets=sockets)
 
-    async def serve(self):
+    async def serve(self, sockets=None):
         process_id = os.getpid()
 
         config = self.config
@@ -35,7 +47,7 @@ class Server(BaseServer):
         await self.install_signal_handlers()
 
         self.logger.info(f"Started server process [{process_id}]")
-        await self.startup()
+        await self.startup(sockets=sockets)
         await self.main_loop()
         await self.shutdown()
         self.logger.info(f"Finished server process [{process_id}]")
@@ -58,7 +70,14 @@ class UvicornAdapter(object):
     async def __call__(self, **kwargs):
         kwargs.pop("loop", None)
         app = kwargs.pop("app")
+        reuse_port = kwargs.pop("reuse_port", None)
+        if reuse_port is None:
+            reuse_port = is_prefork(self.context.config)
         config = Config(app, **kwargs)
         server = Server(config=config, context=self.context)
 
-        await server.run()
+        sockets = None
+        if reuse_port and config.uds is None and config.fd is None:
+            sockets = [bind_reuse_port_socket(config)]
+
+        await server.run(sockets=sockets)
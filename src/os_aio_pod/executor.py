@@ -0,0 +1,54 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ThreadPool(ThreadPoolExecutor):
+    """Thread pool which counts queued calls, busy threads and completed calls."""
+
+    def __init__(self, max_workers=None, name="default"):
+        super(ThreadPool, self).__init__(
+            max_workers, thread_name_prefix=f"Executor-{name}"
+        )
+        self.name = name
+        self.queued = 0
+        self.busy = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.busy += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.busy -= 1
+                self.completed += 1
+
+    def _on_done(self, future):
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            self.queued += 1
+        try:
+            future = super(ThreadPool, self).submit(self._call, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def stats(self):
+        return {
+            "max_workers": self._max_workers,
+            "threads": len(self._threads),
+            "busy": self.busy,
+            "queued": self.queued,
+            "completed": self.completed,
+            "utilisation": self.busy / self._max_workers,
+        }
@@ -4,6 +4,7 @@ import logging
 import sys
 from signal import Signals
 
+from os_aio_pod.monitor import LagMonitor
 from os_aio_pod.pod import Pod
 from os_aio_pod.utils import load_obj, pydantic_items
 
@@ -58,12 +59,26 @@ class InitDebug(Initializer):
             logging.getLogger().setLevel(logging.DEBUG)
 
 
+class InitLagMonitor(Initializer):
+    def init(self, config, pod):
+        if config.LAG_THRESHOLD:
+            pod.lag_monitor = LagMonitor(
+                pod.loop,
+                config.LAG_THRESHOLD,
+                interval=config.LAG_INTERVAL,
+                metrics=pod.metrics,
+            )
+            pod.lag_monitor.start()
+
+
 class InitSignal(Initializer):
     def init(self, config, pod):
         for sig in (Signals.SIGINT, Signals.SIGTERM):
             pod.loop.add_signal_handler(
                 sig.value, pod.stop, config.STOP_WAIT_TIME, sig.name
             )
+        if config.BEAN_STATS:
+            pod.loop.add_signal_handler(Signals.SIGUSR1.value, pod.log_stats)
 
 
 class InitBeans(Initializer):
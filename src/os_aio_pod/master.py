@@ -0,0 +1,136 @@
+import logging
+import os
+import signal
+import sys
+import time
+from signal import Signals
+
+STOP_SIGNALS = (Signals.SIGINT, Signals.SIGTERM)
+KILL_GRACE_TIME = 5
+RESPAWN_INTERVAL = 1
+POLL_INTERVAL = 0.1
+
+
+class Master(object):
+    """Prefork master, each worker process runs its own pod.
+
+    Stop signals are forwarded to all the workers at once, they are killed
+    when still running at the shared deadline. Workers crashed before
+    stopping are respawned.
+    """
+
+    def __init__(self, config, target):
+        self._config = config
+        self._target = target
+        self._workers = {}
+        self._respawns = {}
+        self._spawned_at = {}
+        self._stopping = None
+        self._stop_deadline = None
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def workers(self):
+        return dict(self._workers)
+
+    def _spawn(self, idx):
+        pid = os.fork()
+        if pid:
+            self._workers[idx] = pid
+            self._spawned_at[idx] = time.time()
+            self._logger.debug(f"Spawn worker {idx} pid: {pid}")
+            return pid
+
+        code = 0
+        try:
+            os.setpgid(0, 0)
+            for sig in STOP_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            self._target(self._config.copy(update={"WORKER_INDEX": idx}))
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            self._logger.exception(f"Worker {idx} error")
+            code = 1
+        finally:
+            # os._exit skips the interpreter cleanup, flush buffered output first
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+            os._exit(code)
+
+    def _on_signal(self, signum, frame):
+        sig = Signals(signum)
+        self._logger.debug(f"Recv signal {sig.name}")
+        if self._stopping is None:
+            self._stopping = sig
+            self._stop_all()
+        else:
+            for pid in self._workers.values():
+                self._kill(pid, sig)
+
+    def _kill(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _stop_all(self):
+        self._respawns.clear()
+        self._logger.debug(f"Stopping workers {sorted(self._workers)}")
+        for idx in sorted(self._workers):
+            self._kill(self._workers[idx], self._stopping)
+        wait_time = self._config.STOP_WAIT_TIME
+        self._stop_deadline = (
+            None if wait_time is None else time.time() + wait_time + KILL_GRACE_TIME
+        )
+
+    def _on_worker_exit(self, pid, status):
+        idx = next(i for i, p in self._workers.items() if p == pid)
+        self._workers.pop(idx)
+        code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+        self._logger.debug(f"Worker {idx} pid: {pid} exit {code}")
+        if self._stopping is None and code != 0:
+            self._logger.warning(f"Worker {idx} crashed, respawn")
+            due = self._spawned_at[idx] + RESPAWN_INTERVAL
+            self._respawns[idx] = max(due, time.time())
+
+    def _reap(self):
+        while self._workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in self._workers.values():
+                self._on_worker_exit(pid, status)
+
+    def _check(self):
+        now = time.time()
+        for idx, due in list(self._respawns.items()):
+            if due <= now and self._respawns.pop(idx, None) is not None:
+                self._spawn(idx)
+
+        if self._workers and self._stop_deadline and self._stop_deadline <= now:
+            for idx in sorted(self._workers):
+                self._logger.warning(f"Kill worker {idx}")
+                self._kill(self._workers[idx], Signals.SIGKILL)
+            self._stop_deadline = None
+
+    def run(self):
+        for sig in STOP_SIGNALS:
+            signal.signal(sig, self._on_signal)
+
+        self._logger.debug(f"Master start, workers: {self._config.WORKERS}")
+        for idx in range(self._config.WORKERS):
+            self._spawn(idx)
+
+        while self._workers or self._respawns:
+            self._reap()
+            self._check()
+            time.sleep(POLL_INTERVAL)
+
+        self._logger.debug(f"Master finished")
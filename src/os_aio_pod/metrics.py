@@ -0,0 +1,169 @@
+from bisect import bisect_left
+from collections import OrderedDict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter(object):
+    __slots__ = ("value", "function")
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self.function = None
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def set_function(self, function):
+        self.function = function
+
+    def samples(self, name, labels):
+        value = self.function() if self.function is not None else self.value
+        yield name, labels, value
+
+
+class Gauge(Counter):
+    __slots__ = ()
+    kind = "gauge"
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram(object):
+    """Observations counted in the first bucket they fit in.
+
+    ``observe`` is one bisect and two additions, buckets are made
+    cumulative when collected.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = sorted(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            yield f"{name}_bucket", labels + (("le", repr(float(bound))),), total
+        total += self.counts[-1]
+        yield f"{name}_bucket", labels + (("le", "+Inf"),), total
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, total
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        name = f"{name}{{{pairs}}}"
+    return f"{name} {value}"
+
+
+class Registry(object):
+    """Metrics by name and labels, rendered in Prometheus text format.
+
+    Collectors are called when rendering and yield
+    ``(name, kind, help, labels, value)`` for values which are cheaper to
+    read than to track. Metrics labeled with ``bean_id`` are indexed by
+    bean to be removed when the bean is done.
+    """
+
+    def __init__(self):
+        self._families = OrderedDict()
+        self._collectors = []
+        self._bean_metrics = {}
+
+    def _get(self, cls, name, help, labels, *args):
+        family = self._families.get(name, None)
+        if family is None:
+            family = self._families[name] = (cls, help, {})
+        elif family[0] is not cls:
+            raise ValueError(f"Metric {name} is a {family[0].kind}")
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        metric = family[2].get(key, None)
+        if metric is None:
+            metric = family[2][key] = cls(*args)
+            if "bean_id" in labels:
+                bean_id = str(labels["bean_id"])
+                self._bean_metrics.setdefault(bean_id, []).append((name, key))
+        return metric
+
+    def counter(self, name, help="", **labels):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(Histogram, name, help, labels, buckets)
+
+    def remove_bean(self, bean_id):
+        """Remove the metrics labeled with ``bean_id``."""
+        for name, key in self._bean_metrics.pop(str(bean_id), ()):
+            metrics = self._families[name][2]
+            del metrics[key]
+            if not metrics:
+                del self._families[name]
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        self._collectors.remove(collector)
+
+    def render(self):
+        lines = []
+        for name, (cls, help, metrics) in self._families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {cls.kind}")
+            for labels, metric in metrics.items():
+                for sample in metric.samples(name, labels):
+                    lines.append(_format_sample(*sample))
+
+        collected = OrderedDict()
+        for collector in self._collectors:
+            for name, kind, help, labels, value in collector():
+                labels = tuple(sorted((k, str(v)) for k, v in labels.items()))
+                collected.setdefault(name, (kind, help, []))[2].append((labels, value))
+        for name, (kind, help, samples) in collected.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(_format_sample(name, labels, value))
+        lines.append("")
+        return "\n".join(lines)
+
+
+class BeanMetrics(object):
+    """Registry view which labels metrics with the bean id and label."""
+
+    __slots__ = ("registry", "labels")
+
+    def __init__(self, registry, bean_id, bean_label=None):
+        self.registry = registry
+        self.labels = {"bean_id": bean_id, "bean_label": bean_label or ""}
+
+    def counter(self, name, help="", **labels):
+        return self.registry.counter(name, help, **self.labels, **labels)
+
+    def gauge(self, name, help="", **labels):
+        return self.registry.gauge(name, help, **self.labels, **labels)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS, **labels):
+        return self.registry.histogram(name, help, buckets, **self.labels, **labels)
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def current_task(loop):
+    if hasattr(asyncio, "current_task"):
+        return asyncio.current_task(loop)
+    return asyncio.Task.current_task(loop)
+
+
+class LagMonitor(object):
+    """Measure event loop lag and capture the stack of stalls.
+
+    A callback scheduled every ``interval`` seconds records how late it
+    runs and sets a heartbeat. A watchdog thread checks the heartbeat,
+    when the loop is blocked for ``threshold`` seconds it captures the
+    stack of the loop thread and the running task, which is the bean when
+    it is a ``Bean``.
+    """
+
+    def __init__(self, loop, threshold, interval=None, metrics=None, max_events=100):
+        self.loop = loop
+        self.threshold = threshold
+        self.interval = interval if interval else threshold / 2
+        self.events = deque(maxlen=max_events)
+        self.lag = 0.0
+        self._thread_id = None
+        self._heartbeat = None
+        self._expected = None
+        self._handle = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._metrics = metrics
+        self._histogram = None
+        if metrics is not None:
+            self._histogram = metrics.histogram(
+                "pod_loop_lag_seconds", "Event loop lag", buckets=LAG_BUCKETS
+            )
+        self.stalls = 0
+
+    def start(self):
+        self._stopped.clear()
+        self._handle = self.loop.call_soon(self._probe)
+        self._watchdog = threading.Thread(
+            target=self._watch, name="LagMonitor", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def _probe(self):
+        now = self.loop.time()
+        if self._expected is not None:
+            self.lag = max(now - self._expected, 0.0)
+            if self._histogram is not None:
+                self._histogram.observe(self.lag)
+        else:
+            self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._expected = now + self.interval
+        self._handle = self.loop.call_later(self.interval, self._probe)
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.interval):
+            if self.loop.is_closed():
+                break
+            heartbeat = self._heartbeat
+            if heartbeat is None or heartbeat == reported:
+                continue
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked >= self.threshold:
+                reported = heartbeat
+                self._capture(blocked)
+
+    def _count_stall(self, bean_id, bean_label):
+        self._metrics.counter(
+            "pod_loop_stalls_total",
+            "Event loop stalls",
+            bean_id=bean_id,
+            bean_label=bean_label or "",
+        ).inc()
+
+    def _capture(self, blocked):
+        frame = sys._current_frames().get(self._thread_id, None)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        task = current_task(self.loop)
+        context = getattr(task, "context", None)
+        bean_id = getattr(context, "id", None)
+        bean_label = getattr(context, "label", None)
+        self.events.append(
+            {
+                "time": time.time(),
+                "blocked": blocked,
+                "bean_id": bean_id,
+                "bean_label": bean_label,
+                "task": repr(task),
+                "stack": stack,
+            }
+        )
+        self.stalls += 1
+        if self._metrics is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self._count_stall, bean_id, bean_label)
+            except RuntimeError:
+                # the loop closed since checked
+                pass
+        self._logger.warning(
+            f"Loop blocked for {blocked:.3f}s by bean {bean_id}-{bean_label} "
+            f"task {task!r}\n{stack}"
+        )
@@ -1,13 +1,21 @@
 import asyncio
 import logging
+import os
 import time
 from collections import OrderedDict
-from functools import partial
-from inspect import isclass, iscoroutine, iscoroutinefunction
+from concurrent.futures import ProcessPoolExecutor
+from inspect import isawaitable, isclass, iscoroutine, iscoroutinefunction
+from itertools import count
 
-from asyncio_dispatch import Signal
+from os_aio_pod.bean import Bean, BeanContext, BeanStats, TimedCoroutine
+from os_aio_pod.channel import Channel
+from os_aio_pod.config import RestartPolicy
+from os_aio_pod.executor import ThreadPool
+from os_aio_pod.metrics import Registry
+from os_aio_pod.shm import DEFAULT_SIZE, ShmChannel
 
-from os_aio_pod.bean import Bean, BeanContext
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 60.0
 
 
 def create(config, *initializers):
@@ -18,17 +26,201 @@ def create(config, *initializers):
     return pod
 
 
+class SignalDispatcher(object):
+    """Signal handlers indexed by signal key, sender bean id and label.
+
+    Handlers registered with senders are dropped by ``disconnect_sender``
+    once the bean is done, no weak references are needed.
+    """
+
+    def __init__(self, loop=None):
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self._handlers = {}
+        self._labels = {}
+        self._senders = {}
+        self.sent = {}
+        self.handled = {}
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def connect(self, key, callback, sender=None, label=None):
+        callbacks = self._handlers.setdefault(key, {}).setdefault(sender, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+        if sender is None:
+            return
+        keys = self._senders.setdefault(sender, (label, set()))[1]
+        keys.add(key)
+        if label is not None:
+            self._labels.setdefault(key, {}).setdefault(label, set()).add(sender)
+
+    def disconnect(self, key, callback, sender=None):
+        handlers = self._handlers.get(key, None)
+        if not handlers or sender not in handlers:
+            return
+        callbacks = handlers[sender]
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._remove(key, sender)
+
+    def disconnect_sender(self, sender):
+        if sender not in self._senders:
+            return
+        for key in list(self._senders[sender][1]):
+            self._remove(key, sender)
+
+    def _remove(self, key, sender):
+        handlers = self._handlers[key]
+        del handlers[sender]
+        if not handlers:
+            del self._handlers[key]
+        if sender is None:
+            return
+        label, keys = self._senders[sender]
+        keys.discard(key)
+        if not keys:
+            del self._senders[sender]
+        if label is not None:
+            senders = self._labels[key][label]
+            senders.discard(sender)
+            if not senders:
+                del self._labels[key][label]
+                if not self._labels[key]:
+                    del self._labels[key]
+
+    def _callbacks(self, key, senders=None, labels=None):
+        handlers = self._handlers.get(key, None)
+        if not handlers:
+            return []
+        if senders is None and labels is None:
+            return [c for callbacks in handlers.values() for c in callbacks]
+        bids = set(senders) if senders else set()
+        if labels:
+            by_label = self._labels.get(key, {})
+            for label in labels:
+                bids.update(by_label.get(label, ()))
+        return [c for bid in bids if bid in handlers for c in handlers[bid]]
+
+    async def send(self, key, senders=None, labels=None, timeout=None, **kwargs):
+        """Call matched handlers, coroutine handlers run concurrently.
+
+        Returns the results in call order, exceptions are returned as values,
+        handlers not done within timeout are cancelled and get
+        ``asyncio.TimeoutError``.
+        """
+        results = []
+        tasks = {}
+        callbacks = self._callbacks(key, senders, labels)
+        self.sent[key] = self.sent.get(key, 0) + 1
+        self.handled[key] = self.handled.get(key, 0) + len(callbacks)
+        keys = {key}
+        senders = set(senders) if senders else set()
+        for callback in callbacks:
+            try:
+                r = callback(signal=self, senders=senders, keys=keys, **kwargs)
+                if isawaitable(r):
+                    tasks[len(results)] = asyncio.ensure_future(r, loop=self._loop)
+                    r = None
+            except Exception as e:
+                r = e
+            results.append(r)
+
+        if tasks:
+            done, pending = await asyncio.wait(
+                tasks.values(), timeout=timeout, loop=self._loop
+            )
+            for task in pending:
+                task.cancel()
+            for idx, task in tasks.items():
+                if task not in done:
+                    results[idx] = asyncio.TimeoutError()
+                elif task.cancelled():
+                    results[idx] = asyncio.CancelledError()
+                else:
+                    results[idx] = task.exception() or task.result()
+
+        for r in results:
+            if isinstance(r, Exception):
+                self._logger.warning(f"Signal {key} handler error {r!r}")
+        return results
+
+
+class Supervisor(object):
+    __slots__ = (
+        "obj",
+        "kwargs",
+        "restart",
+        "max_restarts",
+        "backoff",
+        "max_backoff",
+        "restarts",
+        "restart_time",
+        "started_at",
+        "failed_at",
+        "attempt",
+        "handle",
+    )
+
+    def __init__(self, obj, kwargs, restart, max_restarts, backoff, max_backoff):
+        self.obj = obj
+        self.kwargs = kwargs
+        self.restart = RestartPolicy(restart)
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.restarts = 0
+        self.restart_time = 0.0
+        self.started_at = self.failed_at = None
+        self.attempt = 0
+        self.handle = None
+
+    def should_restart(self, bean):
+        if bean.cancelled() or self.restart == RestartPolicy.never:
+            return False
+        if self.max_restarts is not None and self.restarts >= self.max_restarts:
+            return False
+        return self.restart == RestartPolicy.always or bean.exception() is not None
+
+    def next_delay(self, now):
+        if self.started_at is not None and now - self.started_at >= self.max_backoff:
+            self.attempt = 0
+        delay = min(self.backoff * 2**self.attempt, self.max_backoff)
+        self.attempt += 1
+        self.failed_at = now
+        return delay
+
+    def stats(self):
+        return {"restarts": self.restarts, "restart_time": self.restart_time}
+
+
 class Pod(object):
     def __init__(self, config=None, loop=None):
         self._loop = loop if loop else asyncio.get_event_loop()
         self._beans = OrderedDict()
+        self._bean_ids = count(1)
         self._label_index = {}
         self._finished = set()
         self._pending = set()
         self._coros = []
         self._bean_done_events = {}
-        self._signal_dispatcher = Signal(loop=self._loop)
-        self._stopped = self._started = False
+        self._supervisors = {}
+        self._signal_dispatcher = SignalDispatcher(loop=self._loop)
+        self._channels = {}
+        self._shm_channels = {}
+        self._metrics = Registry()
+        self._metrics.add_collector(self._collect_metrics)
+        self.lag_monitor = None
+        self._bean_stats = {} if getattr(config, "BEAN_STATS", False) else None
+        self._executor = ThreadPool(getattr(config, "EXECUTOR_THREADS", None))
+        self._loop.set_default_executor(self._executor)
+        self._executors = OrderedDict(
+            [
+                (name, ThreadPool(threads, name))
+                for name, threads in getattr(config, "EXECUTORS", {}).items()
+            ]
+        )
+        self._process_pools = {}
+        self._stopped = self._started = self._stopping = False
         self._finished_event = asyncio.Event(loop=self._loop)
         self._stopping_event = asyncio.Event(loop=self._loop)
         self._logger = logging.getLogger(self.__class__.__name__)
@@ -42,9 +234,116 @@ class Pod(object):
     def loop(self):
         return self._loop
 
+    @property
+    def metrics(self):
+        return self._metrics
+
+    def channel(self, name, maxsize=0):
+        channel = self._channels.get(name, None)
+        if channel is None:
+            channel = self._channels[name] = Channel(name, maxsize, loop=self._loop)
+        return channel
+
+    def shm_channel(self, name, producer=False, size=DEFAULT_SIZE):
+        key = (name, producer)
+        channel = self._shm_channels.get(key, None)
+        if channel is None:
+            channel = ShmChannel(name, producer, size, loop=self._loop)
+            self._shm_channels[key] = channel
+        return channel
+
+    def channel_stats(self):
+        return dict([(name, c.stats()) for name, c in self._channels.items()])
+
+    def shm_channel_stats(self):
+        stats = {}
+        for (name, producer), channel in self._shm_channels.items():
+            end = "producer" if producer else "consumer"
+            stats.setdefault(name, {})[end] = channel.stats()
+        return stats
+
+    def executor(self, name=None):
+        return self._executors.get(name, self._executor)
+
+    def run_in_thread(self, fn, *args, executor=None):
+        return self._loop.run_in_executor(self.executor(executor), fn, *args)
+
+    def process_pool(self, workers=None):
+        workers = workers or os.cpu_count()
+        pool = self._process_pools.get(workers, None)
+        if pool is None:
+            pool = self._process_pools[workers] = ProcessPoolExecutor(workers)
+        return pool
+
+    def executor_stats(self):
+        pools = [self._executor] + list(self._executors.values())
+        return dict([(pool.name, pool.stats()) for pool in pools])
+
+    def _collect_metrics(self):
+        for state, bids in (("pending", self._pending), ("finished", self._finished)):
+            yield "pod_beans", "gauge", "Beans by state", {"state": state}, len(bids)
+        restarts = sum(s.restarts for s in self._supervisors.values())
+        yield "pod_bean_restarts_total", "counter", "Bean restarts", {}, restarts
+        for bid, stats in (self._bean_stats or {}).items():
+            if bid not in self._pending:
+                continue
+            labels = {"bean_id": bid, "bean_label": self._beans[bid].label or ""}
+            yield "pod_bean_steps_total", "counter", "Bean steps", labels, stats.steps
+            yield (
+                "pod_bean_step_seconds_total",
+                "counter",
+                "Bean step time",
+                labels,
+                stats.time,
+            )
+        dispatcher = self._signal_dispatcher
+        for key, count in dispatcher.sent.items():
+            labels = {"signal": key}
+            yield "pod_signals_sent_total", "counter", "Signals sent", labels, count
+            yield (
+                "pod_signal_handlers_called_total",
+                "counter",
+                "Signal handler calls",
+                labels,
+                dispatcher.handled[key],
+            )
+        for name, channel in self._channels.items():
+            labels = {"channel": name}
+            yield "pod_channel_depth", "gauge", "Channel depth", labels, len(channel)
+            yield "pod_channel_puts_total", "counter", "Items put", labels, channel.puts
+            yield "pod_channel_gets_total", "counter", "Items got", labels, channel.gets
+        for (name, producer), channel in self._shm_channels.items():
+            labels = {"channel": name, "end": "producer" if producer else "consumer"}
+            yield "pod_shm_channel_depth", "gauge", "Records", labels, len(channel)
+            yield "pod_shm_channel_puts_total", "counter", "Put", labels, channel.puts
+            yield "pod_shm_channel_gets_total", "counter", "Got", labels, channel.gets
+        for name, stats in self.executor_stats().items():
+            labels = {"executor": name}
+            yield "pod_executor_threads", "gauge", "Threads", labels, stats["threads"]
+            yield "pod_executor_busy", "gauge", "Busy threads", labels, stats["busy"]
+            queued = stats["queued"]
+            yield "pod_executor_queued", "gauge", "Queued calls", labels, queued
+            yield (
+                "pod_executor_completed_total",
+                "counter",
+                "Executor completed calls",
+                labels,
+                stats["completed"],
+            )
+
     async def wait_beans_done(self, bid_or_label):
-        beans = self.get_beans(bid_or_label)
-        await asyncio.wait(beans, loop=self._loop)
+        for bean in self.get_beans(bid_or_label):
+            await self._bean_done_event(bean.id).wait()
+
+    def _bean_done_event(self, bid):
+        event = self._bean_done_events.get(bid, None)
+        if event is None:
+            event = asyncio.Event(loop=self._loop)
+            if bid in self._finished:
+                event.set()
+            else:
+                self._bean_done_events[bid] = event
+        return event
 
     def __ensure_status(self, status, true_or_false=True):
         s = "_" + status
@@ -52,29 +351,115 @@ class Pod(object):
             hasattr(self, s) and getattr(self, s) == true_or_false
         ), f"Invalid status {status}: {true_or_false}"
 
-    def add_bean(self, obj, label=None, **kwargs):
+    def add_bean(
+        self,
+        obj,
+        label=None,
+        restart=RestartPolicy.never,
+        max_restarts=None,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        **kwargs,
+    ):
         self.__ensure_status("stopped", False)
         self.__ensure_status("started", False)
-        self._preprocess(obj, label, **kwargs)
+        supervisor = self._supervisor(
+            obj, kwargs, restart, max_restarts, backoff, max_backoff
+        )
+        self._preprocess(obj, label, supervisor, **kwargs)
+
+    def spawn(
+        self,
+        obj,
+        label=None,
+        restart=RestartPolicy.never,
+        max_restarts=None,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        **kwargs,
+    ):
+        self.__ensure_status("stopped", False)
+        self.__ensure_status("started")
+        assert not self._finished_event.is_set(), "Pod is finishing"
+        assert not self._stopping_event.is_set(), "Pod is stopping"
+        self._check_bean_type(obj)
+        supervisor = self._supervisor(
+            obj, kwargs, restart, max_restarts, backoff, max_backoff
+        )
+        factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._create_bean)
+        try:
+            bean = self._loop.create_task((obj, label, kwargs))
+        finally:
+            self._loop.set_task_factory(factory)
+        self._load_bean(bean, supervisor)
+        self._logger.debug(f"Spawn bean: {bean}")
+        return bean
+
+    def _supervisor(self, obj, kwargs, restart, max_restarts, backoff, max_backoff):
+        if restart is None or RestartPolicy(restart) == RestartPolicy.never:
+            return None
+        if iscoroutine(obj):
+            raise TypeError(f"Can not restart coroutine object {obj}")
+        return Supervisor(obj, kwargs, restart, max_restarts, backoff, max_backoff)
+
+    def restart_stats(self, bid_or_label=None):
+        bids = self._supervisors.keys()
+        if bid_or_label is not None:
+            bids = [bean.id for bean in self.get_beans(bid_or_label)]
+        return dict(
+            [
+                (bid, self._supervisors[bid].stats())
+                for bid in bids
+                if bid in self._supervisors
+            ]
+        )
 
-    def _load_beans(self):
-        for obj, label, kwargs in self._coros:
-            self._load_bean(obj, label, **kwargs)
+    def stats(self, bid_or_label=None):
+        if self._bean_stats is None:
+            return {}
+        bids = self._bean_stats.keys()
+        if bid_or_label is not None:
+            bids = [bean.id for bean in self.get_beans(bid_or_label)]
+        stats = {}
+        for bid in bids:
+            if bid in self._bean_stats:
+                stats[bid] = self._bean_stats[bid].dict()
+                stats[bid]["label"] = self._beans[bid].label
+        return stats
+
+    def log_stats(self):
+        stats = self.stats()
+        lines = [
+            f"{bid:>8} {s['label']!s:>16} {s['steps']:>10} "
+            f"{s['time']:>10.3f}s {s['max_step'] * 1000:>10.3f}ms"
+            for bid, s in sorted(stats.items(), key=lambda i: -i[1]["time"])
+        ]
+        header = f"{'bean':>8} {'label':>16} {'steps':>10} {'time':>11} {'max':>12}"
+        self._logger.info("Bean stats\n" + "\n".join([header] + lines))
 
-    def _load_bean(self, obj, label=None, **kwargs):
+    def _load_beans(self):
+        factory = self._loop.get_task_factory()
         self._loop.set_task_factory(self._create_bean)
         try:
-            bean = self._loop.create_task((obj, label, kwargs))
-            self._beans[bean.id] = bean
-            self._pending.add(bean.id)
-            self._bean_done_events[bean.id] = asyncio.Event(loop=self._loop)
-            bean.add_done_callback(partial(self._on_bean_done, bean.id))
-            if bean.label:
-                if bean.label not in self._label_index:
-                    self._label_index[bean.label] = []
-                self._label_index[bean.label].append(bean.id)
+            for obj, label, kwargs, supervisor in self._coros:
+                bean = self._loop.create_task((obj, label, kwargs))
+                self._load_bean(bean, supervisor)
         finally:
-            self._loop.set_task_factory(None)
+            self._loop.set_task_factory(factory)
+        self._coros = []
+
+    def _load_bean(self, bean, supervisor=None):
+        self._beans[bean.id] = bean
+        self._pending.add(bean.id)
+        bean.add_done_callback(self._on_bean_done)
+        if supervisor is not None:
+            supervisor.started_at = self._loop.time()
+            self._supervisors[bean.id] = supervisor
+        if bean.label:
+            if bean.label not in self._label_index:
+                self._label_index[bean.label] = []
+            self._label_index[bean.label].append(bean.id)
 
     def get_beans(self, bid_or_label):
         bids = [bid_or_label]
@@ -82,14 +467,66 @@ class Pod(object):
             bids = self._label_index[bid_or_label]
         return [self._beans[bid] for bid in bids]
 
-    def _on_bean_done(self, bid, future):
-        self._logger.debug(f"Bean finished {self._beans[bid]}")
-        if bid in self._pending:
-            self._pending.remove(bid)
-        self._finished.add(bid)
-        self._bean_done_events[bid].set()
+    def _on_bean_done(self, bean):
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(f"Bean finished {bean}")
+        if not bean.cancelled():
+            # retrieve the exception, it is reported with the bean above
+            bean.exception()
+        bid = bean.id
+        self._signal_dispatcher.disconnect_sender(bid)
+        supervisor = self._supervisors.get(bid, None)
+        if (
+            supervisor is not None
+            and not self._stopping
+            and supervisor.should_restart(bean)
+        ):
+            delay = supervisor.next_delay(self._loop.time())
+            error = None if bean.cancelled() else bean.exception()
+            self._logger.warning(f"Restart bean {bid} in {delay:.2f}s, error: {error}")
+            supervisor.handle = self._loop.call_later(delay, self._restart_bean, bid)
+            return
+        self._finish_bean(bid)
 
-    def _preprocess(self, obj, label=None, **kwargs):
+    def _restart_bean(self, bid):
+        supervisor = self._supervisors[bid]
+        supervisor.handle = None
+        label = self._beans[bid].label
+        try:
+            bean = self._create_bean(
+                self._loop, (supervisor.obj, label, supervisor.kwargs), bid=bid
+            )
+        except Exception as e:
+            self._logger.error(f"Restart bean {bid} error {e}")
+            self._finish_bean(bid)
+            return
+        self._beans[bid] = bean
+        bean.add_done_callback(self._on_bean_done)
+        now = self._loop.time()
+        supervisor.restarts += 1
+        supervisor.restart_time += now - supervisor.failed_at
+        supervisor.started_at = now
+        self._logger.debug(f"Bean restarted {bean}")
+
+    def _finish_bean(self, bid):
+        self._pending.discard(bid)
+        self._finished.add(bid)
+        for channel in self._channels.values():
+            channel.remove_producer(bid)
+        for channel in self._shm_channels.values():
+            channel.remove_producer(bid)
+        self._metrics.remove_bean(bid)
+        event = self._bean_done_events.pop(bid, None)
+        if event is not None:
+            event.set()
+        if not self._pending:
+            self._finished_event.set()
+
+    def _preprocess(self, obj, label=None, supervisor=None, **kwargs):
+        self._check_bean_type(obj)
+        self._coros.append((obj, label, kwargs, supervisor))
+
+    def _check_bean_type(self, obj):
         if not (
             iscoroutine(obj)
             or iscoroutinefunction(obj)
@@ -101,13 +538,12 @@ class Pod(object):
             or hasattr(obj, "__bean_label")
         ):
             raise TypeError(f"Invalid type {obj}")
-        self._coros.append((obj, label, kwargs))
 
-    def _create_bean(self, loop, kw):
+    def _create_bean(self, loop, kw, bid=None):
         obj, label, kwargs = kw
         instance = None
         coro = obj
-        idx = 1 if not self._beans else list(self._beans.keys())[-1] + 1
+        idx = next(self._bean_ids) if bid is None else bid
         pass_context = False
         if hasattr(obj, "__bean_label"):
             lb = getattr(obj, "__bean_label")
@@ -133,39 +569,55 @@ class Pod(object):
             raise TypeError(f"Invalid type {obj}")
 
         context.instance = instance
+        if self._bean_stats is not None:
+            stats = self._bean_stats.get(idx, None)
+            if stats is None:
+                stats = self._bean_stats[idx] = BeanStats()
+            coro = TimedCoroutine(coro, stats)
         return Bean(context, coro, loop=self._loop)
 
-    async def __signal(self, method, sig, callers=None, **kwargs):
-        call = getattr(self._signal_dispatcher, method)
-        return await call(key=sig, senders=callers, **kwargs)
-
     async def add_signal_handler(self, sig, callback, callers=None):
-        return await self.__signal("connect", sig, callback=callback, callers=callers)
+        if callers is None:
+            return self._signal_dispatcher.connect(sig, callback)
+        for bean in callers:
+            self._signal_dispatcher.connect(sig, callback, bean.id, bean.label)
 
     async def remove_signal_handler(self, sig, callback, callers=None):
-        return await self.__signal(
-            "disconnect", sig, callback=callback, callers=callers
+        if callers is None:
+            return self._signal_dispatcher.disconnect(sig, callback)
+        for bean in callers:
+            self._signal_dispatcher.disconnect(sig, callback, bean.id)
+
+    async def send_signal(self, sig, callers=None, labels=None, timeout=None, **kwargs):
+        senders = None if callers is None else [bean.id for bean in callers]
+        return await self._signal_dispatcher.send(
+            sig, senders=senders, labels=labels, timeout=timeout, **kwargs
         )
 
-    async def send_signal(self, sig, callers=None, **kwargs):
-        return await self.__signal("send", sig, callers=callers, **kwargs)
-
     def stop(self, timeout=None, sig=None):
         self.__ensure_status("stopped", False)
         self.__ensure_status("started")
-        if self._stopping_event.is_set():
+        if self._stopping:
             return
+        self._stopping = True
         asyncio.run_coroutine_threadsafe(
             self._stop(time.time(), timeout, sig), self._loop
         )
 
     async def _stop(self, event_time, timeout=None, sig=None):
         self._logger.debug(f"Stopping timeout: {timeout}")
+        for bid, supervisor in self._supervisors.items():
+            if supervisor.handle is not None:
+                supervisor.handle.cancel()
+                supervisor.handle = None
+                self._finish_bean(bid)
+        wait_time = timeout if timeout is None else event_time + timeout - time.time()
         if sig:
             self._logger.debug(f"Recv signal {sig}")
-            r = await self.send_signal(sig)
-            self._logger.debug(f"Dispatch signal {sig} {r}")
-        wait_time = timeout if timeout is None else event_time + timeout - time.time()
+            r = await self.send_signal(sig, timeout=wait_time)
+            self._logger.debug(f"Dispatch signal {sig} {len(r)}")
+            if wait_time is not None:
+                wait_time = event_time + timeout - time.time()
         try:
             await asyncio.wait_for(self._finished_event.wait(), timeout=wait_time)
         except:
@@ -173,11 +625,27 @@ class Pod(object):
 
         if self._pending:
             self._logger.debug(f"Stop pending beans")
-        for bid in self._pending:
+        for bid in list(self._pending):
             self._beans[bid].cancel()
             self._logger.debug(f"Cancel bean {self._beans[bid]}")
+        if self._pending:
+            await self._finished_event.wait()
+        for channel in self._shm_channels.values():
+            channel.close()
+        if self.lag_monitor is not None:
+            self.lag_monitor.stop()
         self._stopping_event.set()
 
+    def _shutdown_executors(self):
+        # calls still running in threads are not waited for
+        pools = list(self._executors.values()) + [self._executor]
+        for pool in pools:
+            pool.shutdown(wait=False)
+            self._logger.debug(f"Executor {pool.name} shutdown")
+        for workers, pool in self._process_pools.items():
+            pool.shutdown(wait=False)
+            self._logger.debug(f"Process pool of {workers} workers shutdown")
+
     async def run(self):
         self.__ensure_status("stopped", False)
         self.__ensure_status("started", False)
@@ -187,22 +655,17 @@ class Pod(object):
 
         self._load_beans()
 
-        for bean in self._beans.values():
-            self._logger.debug(f"Pending bean: {bean}")
+        if self._logger.isEnabledFor(logging.DEBUG):
+            for bean in self._beans.values():
+                self._logger.debug(f"Pending bean: {bean}")
 
-        # TODO
-        # not a proper way to wait beans complete
-        # when bean catch the CancelledError
-        for next_complete in asyncio.as_completed(self._beans.values()):
-            try:
-                await next_complete
-            except:
-                pass
+        if self._pending:
+            await self._finished_event.wait()
 
         self._finished_event.set()
-        if not self._stopping_event.is_set():
-            self.stop()
-            await self._stopping_event.wait()
+        self.stop()
+        await self._stopping_event.wait()
+        self._shutdown_executors()
         self._started = False
         self._stopped = True
         self._logger.debug(f"Pod finished")
@@ -0,0 +1,390 @@
+import asyncio
+import mmap
+import os
+import struct
+import tempfile
+from collections import deque
+
+from os_aio_pod.channel import ChannelClosed
+
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+DEFAULT_SIZE = 1 << 20
+POLL_INTERVAL = 0.1
+
+HEADER_SIZE = 64
+WRITE_POS, READ_POS, READER_WAITING, WRITER_WAITING = 0, 8, 16, 20
+CLOSED, CONSUMER_CLOSED = 24, 28
+RING_MAGIC = b"AIOPODRB"
+
+# positions, flags, then the magic and the capacity at 32 and 40
+_HEADER = struct.Struct("QQIIII8sQ")
+_POS = struct.Struct("Q")
+_FLAG = struct.Struct("I")
+_LEN = struct.Struct("I")
+
+
+def shm_paths(name):
+    path = os.path.join(SHM_DIR, f"os-aio-pod-{name}")
+    return path, f"{path}.data", f"{path}.space"
+
+
+def _notify(fd):
+    try:
+        os.write(fd, b"\0")
+    except BlockingIOError:
+        pass
+
+
+def _drain(fd):
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+class RingBuffer(object):
+    """Single writer, single reader ring of records in a shared memory file.
+
+    Records are bytes prefixed by their length. The writer publishes its
+    position after copying a record, the reader publishes its position
+    after copying records out. Two fifos, opened read write so they never
+    block, carry the data and space notifications.
+    """
+
+    def __init__(self, name, size=DEFAULT_SIZE):
+        self.name = name
+        self.paths = path, data_fifo, space_fifo = shm_paths(name)
+        fd = self._open(path, size)
+        try:
+            self._mm = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+        self.capacity = len(self._mm) - HEADER_SIZE
+        for fifo in (data_fifo, space_fifo):
+            try:
+                os.mkfifo(fifo, 0o600)
+            except FileExistsError:
+                pass
+        self.data_fd = os.open(data_fifo, os.O_RDWR | os.O_NONBLOCK)
+        self.space_fd = os.open(space_fifo, os.O_RDWR | os.O_NONBLOCK)
+        self.write_pos = self.get(WRITE_POS)
+        self.read_pos = self._seen_read_pos = self.get(READ_POS)
+
+    def _open(self, path, size):
+        # sized and given a header under a temporary name and linked,
+        # never seen empty
+        tmp = f"{path}.{os.getpid()}"
+        fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, HEADER_SIZE + size)
+            os.pwrite(fd, _HEADER.pack(0, 0, 0, 0, 0, 0, RING_MAGIC, size), 0)
+            os.link(tmp, path)
+            return fd
+        except FileExistsError:
+            os.close(fd)
+        except BaseException:
+            os.close(fd)
+            raise
+        finally:
+            os.unlink(tmp)
+        fd = os.open(path, os.O_RDWR)
+        try:
+            self._check(fd, path, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _check(self, fd, path, size):
+        header = os.pread(fd, HEADER_SIZE, 0)
+        file_size = os.fstat(fd).st_size
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{path} is not a ring")
+        magic, capacity = _HEADER.unpack_from(header)[-2:]
+        if magic != RING_MAGIC:
+            raise ValueError(f"{path} is not a ring")
+        if capacity != size or file_size != HEADER_SIZE + capacity:
+            raise ValueError(
+                f"{path} is a ring of {capacity} bytes in {file_size} bytes, "
+                f"expected {size}"
+            )
+
+    def get(self, offset, fmt=_POS):
+        return fmt.unpack_from(self._mm, offset)[0]
+
+    def set(self, offset, value, fmt=_POS):
+        fmt.pack_into(self._mm, offset, value)
+
+    def get_flag(self, offset):
+        return _FLAG.unpack_from(self._mm, offset)[0]
+
+    def set_flag(self, offset, value):
+        _FLAG.pack_into(self._mm, offset, value)
+
+    def used(self):
+        return self.get(WRITE_POS) - self.get(READ_POS)
+
+    def _copy_in(self, pos, data):
+        start = HEADER_SIZE + pos % self.capacity
+        first = min(len(data), HEADER_SIZE + self.capacity - start)
+        self._mm[start : start + first] = data[:first]
+        if first < len(data):
+            self._mm[HEADER_SIZE : HEADER_SIZE + len(data) - first] = data[first:]
+
+    def _copy_out(self, pos, size):
+        start = HEADER_SIZE + pos % self.capacity
+        first = min(size, HEADER_SIZE + self.capacity - start)
+        data = self._mm[start : start + first]
+        if first < size:
+            data += self._mm[HEADER_SIZE : HEADER_SIZE + size - first]
+        return data
+
+    def write(self, data):
+        size = _LEN.size + len(data)
+        if size > self.capacity:
+            raise ValueError(f"Record of {len(data)} bytes exceeds the ring")
+        pos = self.write_pos
+        if self.capacity - (pos - self._seen_read_pos) < size:
+            self._seen_read_pos = self.get(READ_POS)
+            if self.capacity - (pos - self._seen_read_pos) < size:
+                return False
+        mm = self._mm
+        start = HEADER_SIZE + pos % self.capacity
+        if start + size <= len(mm):
+            _LEN.pack_into(mm, start, len(data))
+            mm[start + _LEN.size : start + size] = data
+        else:
+            self._copy_in(pos, _LEN.pack(len(data)))
+            self._copy_in(pos + _LEN.size, memoryview(data))
+        self.write_pos = pos + size
+        _POS.pack_into(mm, WRITE_POS, self.write_pos)
+        return True
+
+    def read(self):
+        mm = self._mm
+        limit = len(mm) - _LEN.size
+        capacity = self.capacity
+        pos = self.read_pos
+        end = self.get(WRITE_POS)
+        records = []
+        while pos < end:
+            start = HEADER_SIZE + pos % capacity
+            if start <= limit:
+                size = _LEN.unpack_from(mm, start)[0]
+                start += _LEN.size
+                stop = start + size
+                if stop <= len(mm):
+                    records.append(mm[start:stop])
+                else:
+                    records.append(self._copy_out(pos + _LEN.size, size))
+            else:
+                size = _LEN.unpack(self._copy_out(pos, _LEN.size))[0]
+                records.append(self._copy_out(pos + _LEN.size, size))
+            pos += _LEN.size + size
+        if records:
+            self.read_pos = pos
+            _POS.pack_into(mm, READ_POS, pos)
+        return records
+
+    def close(self):
+        os.close(self.data_fd)
+        os.close(self.space_fd)
+        self._mm.close()
+
+    def unlink(self):
+        for path in self.paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+class ShmChannel(object):
+    """One direction of a shared memory channel between processes.
+
+    The producer end puts bytes records, the consumer end in another
+    process gets them, with the same API as ``Channel``. Waiting ends are
+    woken through the ring's fifos, ``POLL_INTERVAL`` bounds the delay of
+    a missed notification. Closing the producer end closes the channel,
+    closing the consumer end closes the producer end too and removes the
+    files.
+    """
+
+    def __init__(self, name, producer=False, size=DEFAULT_SIZE, loop=None):
+        self.name = name
+        self.producer = producer
+        self.closed = False
+        self.puts = 0
+        self.gets = 0
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self._ring = RingBuffer(name, size)
+        self._items = deque()
+        self._waiters = []
+        self._producers = set()
+        if producer:
+            self._ring.set_flag(CLOSED, 0)
+            self._fd = self._ring.space_fd
+        else:
+            self._fd = self._ring.data_fd
+        self._loop.add_reader(self._fd, self._on_notified)
+
+    def __len__(self):
+        return len(self._items) + (0 if self.closed else self._ring.used())
+
+    def add_producer(self, bid):
+        self._producers.add(bid)
+
+    def remove_producer(self, bid):
+        if bid in self._producers:
+            self._producers.discard(bid)
+            if not self._producers:
+                self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._loop.remove_reader(self._fd)
+        if self.producer:
+            self._ring.set_flag(CLOSED, 1)
+            _notify(self._ring.data_fd)
+        else:
+            self._ring.set_flag(CONSUMER_CLOSED, 1)
+            _notify(self._ring.space_fd)
+            self._ring.unlink()
+        self._ring.close()
+        self._on_notified(drain=False)
+
+    def _on_notified(self, drain=True):
+        if drain:
+            _drain(self._fd)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _wait(self, flag, ready, timeout=None):
+        # the flag asks the other end to notify, checked again after it is set,
+        # the poll bounds the delay of a notification missed anyway
+        self._ring.set_flag(flag, 1)
+        if ready():
+            return
+        timeout = POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL)
+        waiter = self._loop.create_future()
+        self._waiters.append(waiter)
+        handle = self._loop.call_later(timeout, self._on_notified, False)
+        try:
+            await waiter
+        finally:
+            handle.cancel()
+
+    def _writable(self, data):
+        ring = self._ring
+        return (
+            ring.capacity - ring.used() >= _LEN.size + len(data)
+            or ring.get_flag(CONSUMER_CLOSED)
+        )
+
+    def _readable(self):
+        return self._ring.used() or self._ring.get_flag(CLOSED)
+
+    def put_nowait(self, data):
+        if self.closed:
+            raise ChannelClosed(self.name)
+        ring = self._ring
+        if ring.get_flag(CONSUMER_CLOSED):
+            self.close()
+            raise ChannelClosed(self.name)
+        if not ring.write(data):
+            raise asyncio.QueueFull
+        self.puts += 1
+        if ring.get_flag(READER_WAITING):
+            ring.set_flag(READER_WAITING, 0)
+            _notify(ring.data_fd)
+
+    async def put(self, data):
+        while not self.closed:
+            try:
+                return self.put_nowait(data)
+            except asyncio.QueueFull:
+                await self._wait(WRITER_WAITING, lambda: self._writable(data))
+        raise ChannelClosed(self.name)
+
+    def _fill(self):
+        if self.closed:
+            return
+        ring = self._ring
+        records = ring.read()
+        if records:
+            self._items.extend(records)
+            if ring.get_flag(WRITER_WAITING):
+                ring.set_flag(WRITER_WAITING, 0)
+                _notify(ring.space_fd)
+        elif ring.get_flag(CLOSED) and not ring.used():
+            self.close()
+
+    def get_nowait(self):
+        if not self._items:
+            self._fill()
+            if not self._items:
+                if self.closed:
+                    raise ChannelClosed(self.name)
+                raise asyncio.QueueEmpty
+        self.gets += 1
+        return self._items.popleft()
+
+    async def get(self):
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                await self._wait(READER_WAITING, self._readable)
+
+    async def get_batch(self, max_n=None, timeout=None):
+        """Wait for records and get up to ``max_n`` of them.
+
+        Returns an empty list when no record comes within ``timeout``.
+        """
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while True:
+            if not self._items:
+                self._fill()
+            if self._items:
+                break
+            if self.closed:
+                raise ChannelClosed(self.name)
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    return []
+            await self._wait(READER_WAITING, self._readable, remaining)
+
+        items = self._items
+        if max_n is None or max_n >= len(items):
+            batch = list(items)
+            items.clear()
+        else:
+            batch = [items.popleft() for _ in range(max_n)]
+        self.gets += len(batch)
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except ChannelClosed:
+            raise StopAsyncIteration
+
+    def stats(self):
+        return {
+            "depth": len(self),
+            "capacity": self._ring.capacity,
+            "puts": self.puts,
+            "gets": self.gets,
+            "producers": len(self._producers),
+            "closed": self.closed,
+        }
@@ -4,8 +4,6 @@ import types
 from importlib import import_module
 from pkgutil import iter_modules
 
-from os_aio_pod.config import BlankConfig
-
 
 def pydantic_dict(d, exclude=None):
     if isinstance(d, dict):
@@ -20,6 +18,10 @@ def pydantic_items(d, exclude=None):
         yield k, getattr(d, k)
 
 
+def is_prefork(config):
+    return getattr(config, "WORKERS", 1) > 1
+
+
 def vars_from_module(module, pass_func=None):
     def all_pass(v):
         return True
@@ -43,7 +45,39 @@ def load_core_config_from_pyfile(config_cls, pyfile):
     return load_core_config_from_module(config_cls, module)
 
 
+def is_public(v):
+    return not v.startswith("_")
+
+
+class ConfigFileCache(object):
+    """Public values of config files, executed once per path and mtime.
+
+    The values are shared by all the callers, they should be treated as
+    read only.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def load(self, config_file):
+        path = os.path.abspath(config_file)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._cache.get(path, None)
+        if cached is None or cached[0] != mtime:
+            module = load_module_from_pyfile(path)
+            cached = self._cache[path] = (mtime, vars_from_module(module, is_public))
+        return cached[1]
+
+    def clear(self):
+        self._cache.clear()
+
+
+config_files = ConfigFileCache()
+
+
 def update_from_config_file(old_config, config_file, exclude=None):
+    from os_aio_pod.config import BlankConfig
+
     md = load_module_from_pyfile(os.path.abspath(config_file))
     blank_config = BlankConfig.parse_obj(
         dict([(i, getattr(md, i)) for i in dir(md) if not i.startswith("_")])
@@ -54,6 +88,17 @@ def update_from_config_file(old_config, config_file, exclude=None):
     return new_config
 
 
+def resolve_bean_config(bean):
+    """Bean config values updated from its ``config_file``, not validated."""
+    bean = pydantic_dict(bean)
+    config_file = bean.get("config_file", None)
+    if config_file is None:
+        return bean
+    values = config_files.load(config_file)
+    update = [(k, v) for k, v in values.items() if k not in {"core", "config_file"}]
+    return dict(bean, **dict(update))
+
+
 def update_from_bean_config_file(config):
     bean_configs = []
     for old_config in config.BEANS:
@@ -69,6 +114,24 @@ def update_from_bean_config_file(config):
     return config
 
 
+def load_pod_config(config_cls, config_file=None, beans=None, **options):
+    """Resolve the config file, bean arguments and options in one pass.
+
+    The values are merged as plain data and validated once, bean config
+    files are loaded through ``config_files``.
+    """
+    values = {}
+    if config_file is not None:
+        module_values = config_files.load(config_file)
+        values = dict([(k, v) for k, v in module_values.items() if k.isupper()])
+    bean_configs = list(values.get("BEANS", []))
+    if beans:
+        bean_configs.extend(beans)
+    values["BEANS"] = [resolve_bean_config(bean) for bean in bean_configs]
+    values.update([(k.upper(), v) for k, v in options.items() if v is not None])
+    return config_cls(**values)
+
+
 def module_from_string(base_class, instance=False, package=None):
     assert inspect.isclass(base_class)
 
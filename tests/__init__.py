@@ -0,0 +1,16 @@
+import asyncio
+
+import pytest
+
+
+def loop_argument():
+    try:
+        asyncio.Event(loop=None)
+    except TypeError:
+        return False
+    return True
+
+
+needs_loop_argument = pytest.mark.skipif(
+    not loop_argument(), reason="asyncio primitives do not take the loop argument"
+)
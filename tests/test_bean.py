@@ -0,0 +1,21 @@
+import asyncio
+
+from os_aio_pod.bean import BeanStats, TimedCoroutine
+
+
+async def steps(num):
+    for _ in range(num):
+        await asyncio.sleep(0)
+    return num
+
+
+def test_timed_coroutine():
+    stats = BeanStats()
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(TimedCoroutine(steps(3), stats))
+    finally:
+        loop.close()
+    assert result == 3
+    assert stats.steps == 4
+    assert 0 < stats.max_step <= stats.time
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from os_aio_pod.channel import Channel, ChannelClosed
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_channel():
+    async def flow():
+        channel = Channel("test", 2)
+        channel.add_producer(1)
+
+        async def produce():
+            for i in range(10):
+                await channel.put(i)
+            channel.remove_producer(1)
+
+        producing = asyncio.ensure_future(produce())
+        batches = []
+        try:
+            while True:
+                batches.append(await channel.get_batch(3))
+        except ChannelClosed:
+            pass
+        await producing
+        return channel, batches
+
+    channel, batches = run(flow())
+    assert [i for batch in batches for i in batch] == list(range(10))
+    assert max(len(batch) for batch in batches) <= 2
+    assert channel.closed
+    assert channel.stats()["puts"] == channel.stats()["gets"] == 10
+    with pytest.raises(ChannelClosed):
+        channel.put_nowait(1)
+
+
+def test_channel_get_batch_timeout():
+    async def flow():
+        channel = Channel("test")
+        batch = await channel.get_batch(timeout=0.01)
+        channel.put_nowait(1)
+        return batch, await channel.get_batch(timeout=0.01), channel
+
+    empty, batch, channel = run(flow())
+    assert empty == []
+    assert batch == [1]
+    assert not channel._getters
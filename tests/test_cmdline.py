@@ -0,0 +1,16 @@
+from os_aio_pod.cmdline import CommandIndex
+
+
+def test_command_index(tmpdir):
+    path = tmpdir.join("commands.json").strpath
+    index = CommandIndex(path)
+    assert index.commands("os_aio_pod.commands") == {
+        "run": "os_aio_pod.commands.run"
+    }
+    index.save()
+
+    index = CommandIndex(path)
+    index.scan = None
+    assert index.commands("os_aio_pod.commands") == {
+        "run": "os_aio_pod.commands.run"
+    }
@@ -0,0 +1,23 @@
+import threading
+
+from os_aio_pod.executor import ThreadPool
+
+
+def test_thread_pool_stats():
+    event = threading.Event()
+    pool = ThreadPool(1, "test")
+    try:
+        running = pool.submit(event.wait)
+        queued = pool.submit(sum, [1, 2])
+        cancelled = pool.submit(sum, [3])
+        assert cancelled.cancel()
+        stats = pool.stats()
+        assert stats["queued"] + stats["busy"] == 2
+        event.set()
+        assert running.result() is True
+        assert queued.result() == 3
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["queued"] == stats["busy"] == 0
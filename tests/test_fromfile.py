@@ -0,0 +1,67 @@
+import asyncio
+
+from os_aio_pod.contrib.fromfile import Server
+
+
+class Context(object):
+    def __init__(self, loop):
+        self.loop = loop
+
+
+def read(paths, stop_after=None, **kwargs):
+    loop = asyncio.new_event_loop()
+    server = Server(Context(loop))
+    server.offsets = dict(kwargs.pop("offsets", None) or {})
+    server.stopping = False
+    lines = []
+
+    async def main():
+        async for records in server.read_files(paths=paths, **kwargs):
+            lines.extend(bytes(record) for record in records)
+            if stop_after is not None and len(lines) >= stop_after:
+                server.stopping = True
+
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    return lines, server.offsets
+
+
+def write_lines(tmpdir, name, num):
+    path = tmpdir.join(name)
+    path.write_binary(b"".join(b"%d\n" % i for i in range(num)))
+    return str(path), [b"%d\n" % i for i in range(num)]
+
+
+def test_read(tmpdir):
+    a, a_lines = write_lines(tmpdir, "a.log", 100)
+    b, b_lines = write_lines(tmpdir, "b.log", 10)
+    tmpdir.join("c.log").write_binary(b"x\ny")
+    lines, offsets = read(str(tmpdir.join("*.log")), read_batch_size=7)
+    assert lines == a_lines + b_lines + [b"x\n", b"y"]
+    assert offsets[a] == len(b"".join(a_lines))
+    assert offsets[str(tmpdir.join("c.log"))] == 3
+
+
+def test_resume(tmpdir):
+    path, expected = write_lines(tmpdir, "a.log", 1000)
+    lines, offsets = read(path, stop_after=100, read_batch_size=10)
+    assert lines == expected[: len(lines)]
+    assert 100 <= len(lines) < 1000
+    rest, offsets = read(path, offsets=offsets, read_batch_size=10)
+    assert lines + rest == expected
+    assert read(path, offsets=offsets)[0] == []
+
+
+def test_ranges_resume(tmpdir):
+    path, expected = write_lines(tmpdir, "a.log", 1000)
+    lines, offsets = read(path, stop_after=100, ranges=4, read_batch_size=10)
+    assert isinstance(offsets[path], list)
+    rest, offsets = read(path, offsets=offsets, read_batch_size=10)
+    assert sorted(lines + rest) == sorted(expected)
+    assert offsets[path] == len(b"".join(expected))
+
+    lines, offsets = read(path, ranges=4, read_batch_size=10)
+    assert sorted(lines) == sorted(expected)
+    assert offsets[path] == len(b"".join(expected))
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+from tests import needs_loop_argument
+
+
+class Hello(object):
+    def __init__(self, context):
+        self.context = context
+
+    async def __call__(self, **kwargs):
+        print(f"hello from worker {self.context.config.WORKER_INDEX}")
+
+
+@needs_loop_argument
+def test_workers():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = [os.path.join(root, "src"), root, os.environ.get("PYTHONPATH", "")]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, paths)))
+    env.pop("PYTHONUNBUFFERED", None)
+    code = "from os_aio_pod.main import main; main()"
+    args = [sys.executable, "-c", code, "run", "-w", "2", "tests.test_master.Hello"]
+    proc = subprocess.run(args, stdout=subprocess.PIPE, env=env, timeout=30)
+    assert proc.returncode == 0
+    lines = proc.stdout.decode().splitlines()
+    assert sorted(lines) == ["hello from worker 0", "hello from worker 1"]
@@ -0,0 +1,56 @@
+import pytest
+
+from os_aio_pod.metrics import BeanMetrics, Registry
+
+
+def test_render():
+    registry = Registry()
+    registry.counter("requests_total", "Requests", path="/").inc(2)
+    registry.gauge("queue_size", "Queue size").set_function(lambda: 3)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{path="/"} 2',
+        "# HELP queue_size Queue size",
+        "# TYPE queue_size gauge",
+        "queue_size 3",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 2.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_bean_metrics():
+    registry = Registry()
+    metrics = BeanMetrics(registry, 1, "app")
+    assert metrics.counter("c") is registry.counter("c", bean_id=1, bean_label="app")
+    with pytest.raises(ValueError):
+        metrics.gauge("c")
+
+
+def test_remove():
+    registry = Registry()
+    BeanMetrics(registry, 1).gauge("g").set_function(lambda: 1)
+    BeanMetrics(registry, 2).gauge("g").set(2)
+    BeanMetrics(registry, 1).counter("c").inc()
+    registry.remove_bean(1)
+    registry.remove_bean(3)
+    assert registry.render().splitlines() == [
+        "# HELP g ",
+        "# TYPE g gauge",
+        'g{bean_id="2",bean_label=""} 2',
+    ]
+
+
+def test_collector():
+    registry = Registry()
+    registry.add_collector(lambda: [("beans", "gauge", "Beans", {"state": "a"}, 1)])
+    assert 'beans{state="a"} 1' in registry.render()
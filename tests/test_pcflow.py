@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from os_aio_pod.contrib.pcflow import AIMDLimiter, BatchReader, Pipeline, Server, Stop
+from os_aio_pod.metrics import Registry
+from os_aio_pod.pod import Pod
+from tests import needs_loop_argument
+
+
+def run(main):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(main(loop))
+    finally:
+        loop.close()
+
+
+@needs_loop_argument
+def test_batch_reader_full():
+    async def main(loop):
+        queue = asyncio.Queue()
+        for i in range(5):
+            queue.put_nowait(i)
+        reader = BatchReader(queue, 2, linger=10, loop=loop)
+        batches = [await reader.read(), await reader.read()]
+        reader.close()
+        return batches
+
+    assert run(main) == [[0, 1], [2, 3]]
+
+
+@needs_loop_argument
+def test_batch_reader_linger():
+    async def main(loop):
+        queue = asyncio.Queue()
+        reader = BatchReader(queue, 10, linger=0.05, loop=loop)
+        loop.call_later(0.01, queue.put_nowait, 1)
+        loop.call_later(0.03, queue.put_nowait, 2)
+        loop.call_later(0.2, queue.put_nowait, 3)
+        start = loop.time()
+        batch = await reader.read()
+        elapsed = loop.time() - start
+        assert reader.idle is False
+        batch2 = await reader.read()
+        reader.close()
+        return batch, elapsed, batch2
+
+    batch, elapsed, batch2 = run(main)
+    assert batch == [1, 2]
+    assert 0.05 <= elapsed < 0.15
+    assert batch2 == [3]
+
+
+@needs_loop_argument
+def test_batch_reader_stop():
+    async def main(loop):
+        queue = asyncio.Queue()
+        for obj in (1, 2, Stop(), 3):
+            queue.put_nowait(obj)
+        reader = BatchReader(queue, 10, linger=10, loop=loop)
+        batch = await reader.read()
+        return batch, reader.stopped, queue.qsize()
+
+    assert run(main) == ([1, 2], True, 1)
+
+
+def test_limiter_grows_while_objects_wait():
+    limiter = AIMDLimiter(1, 3)
+    assert limiter.update(10) == 1
+    for expected in (2, 3, 3):
+        limiter.record(0.1)
+        assert limiter.update(10) == expected
+    limiter.record(0.1)
+    assert limiter.update(0) == 3
+
+
+def test_limiter_shrinks_on_latency():
+    limiter = AIMDLimiter(2, 20, tolerance=2.0, backoff_ratio=0.5)
+    for _ in range(10):
+        limiter.record(0.1)
+        limiter.update(10)
+    assert limiter.limit == 12
+    for expected in (6, 3, 2, 2):
+        limiter.record(0.3)
+        assert limiter.update(10) == expected
+
+
+def test_limiter_baseline_drift():
+    limiter = AIMDLimiter(1, 10, baseline_drift=0.5)
+    limiter.record(0.1)
+    limiter.update(0)
+    limiter.record(0.3)
+    limiter.update(0)
+    assert limiter.baseline == pytest.approx(0.15)
+    limiter.record(0.05)
+    limiter.update(0)
+    assert limiter.baseline == 0.05
+
+
+class Context(object):
+    def __init__(self, loop):
+        self.loop = loop
+        self.metrics = Registry()
+
+
+class Numbers(Pipeline):
+    stages = [
+        {"name": "double", "consumer_num": 3},
+        {"name": "odd", "batch_size": 4, "linger_ms": 10},
+        {"name": "collect"},
+    ]
+
+    async def produce(self, **kwargs):
+        for i in range(20):
+            yield i
+
+    async def double(self, obj):
+        await asyncio.sleep(0)
+        return obj * 2 + (obj % 2)
+
+    async def odd(self, objs):
+        self.batches.append(len(objs))
+        return [obj if obj % 2 else None for obj in objs]
+
+    async def collect(self, obj):
+        self.collected.append(obj)
+
+
+@needs_loop_argument
+def test_pipeline():
+    async def main(loop):
+        pipeline = Numbers(Context(loop))
+        pipeline.batches = []
+        pipeline.collected = []
+        await pipeline.run()
+        return pipeline
+
+    pipeline = run(main)
+    assert sorted(pipeline.collected) == [i * 2 + 1 for i in range(1, 20, 2)]
+    assert max(pipeline.batches) <= 4
+    assert sum(pipeline.batches) == 20
+    stats = pipeline.stats()
+    assert [stats[name]["received"] for name in ("double", "odd", "collect")] == [
+        20,
+        20,
+        10,
+    ]
+    assert [stats[name]["emitted"] for name in ("double", "odd", "collect")] == [
+        20,
+        10,
+        0,
+    ]
+    assert all(s["queue_size"] == 0 for s in stats.values())
+
+
+class Squares(Server):
+    results = []
+
+    async def produce(self, **kwargs):
+        for i in range(10):
+            yield i
+
+    @classmethod
+    def consume_sync(cls, obj):
+        return obj * obj
+
+    async def on_consumed(self, objs, results, **kwargs):
+        self.results.extend(results)
+
+
+@needs_loop_argument
+def test_process_pool():
+    loop = asyncio.new_event_loop()
+    try:
+        pod = Pod(None, loop)
+        for _ in range(2):
+            pod.add_bean(Squares, executor="process", workers=2, chunk_size=3)
+        loop.run_until_complete(pod.run())
+    finally:
+        loop.close()
+    assert sorted(Squares.results) == sorted([i * i for i in range(10)] * 2)
+    assert list(pod._process_pools) == [2]
@@ -0,0 +1,179 @@
+import asyncio
+
+from os_aio_pod.pod import Pod, SignalDispatcher, Supervisor
+from tests import needs_loop_argument
+
+
+def run_pod(*beans, stop_after=None, **options):
+    loop = asyncio.new_event_loop()
+    try:
+        pod = Pod(None, loop)
+        for obj, kwargs in beans:
+            pod.add_bean(obj, **dict(options, **kwargs))
+        if stop_after is not None:
+            loop.call_later(stop_after, pod.stop)
+        start = loop.time()
+        loop.run_until_complete(pod.run())
+        return pod, loop.time() - start
+    finally:
+        loop.close()
+
+
+def runs_of(*outcomes):
+    outcomes = list(outcomes)
+
+    async def bean():
+        bean.runs += 1
+        outcome = outcomes.pop(0) if outcomes else None
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    bean.runs = 0
+    return bean
+
+
+@needs_loop_argument
+def test_restart_never():
+    runs = runs_of(ValueError())
+    pod, _ = run_pod((runs, {}), restart="never", backoff=0.01)
+    assert runs.runs == 1
+    assert pod.restart_stats() == {}
+
+
+@needs_loop_argument
+def test_restart_on_failure():
+    runs = runs_of(ValueError(), ValueError())
+    pod, _ = run_pod((runs, {}), restart="on-failure", backoff=0.01)
+    assert runs.runs == 3
+    assert pod.restart_stats()[1]["restarts"] == 2
+
+
+@needs_loop_argument
+def test_restart_always():
+    runs = runs_of()
+    pod, _ = run_pod((runs, {}), restart="always", max_restarts=3, backoff=0.01)
+    assert runs.runs == 4
+    assert pod.restart_stats()[1]["restarts"] == 3
+
+
+@needs_loop_argument
+def test_max_restarts():
+    runs = runs_of(*[ValueError()] * 10)
+    pod, _ = run_pod((runs, {}), restart="on-failure", max_restarts=2, backoff=0.01)
+    assert runs.runs == 3
+    assert pod.restart_stats()[1]["restarts"] == 2
+
+
+@needs_loop_argument
+def test_stop_during_backoff():
+    runs = runs_of(*[ValueError()] * 10)
+    pod, elapsed = run_pod(
+        (runs, {}), restart="on-failure", backoff=10, stop_after=0.05
+    )
+    assert runs.runs == 1
+    assert elapsed < 1
+    assert pod.restart_stats()[1]["restarts"] == 0
+
+
+@needs_loop_argument
+def test_restart_error_finishes_bean():
+    class Broken(object):
+        created = 0
+
+        def __init__(self, context):
+            Broken.created += 1
+            if Broken.created > 1:
+                raise RuntimeError("can not create")
+
+        async def __call__(self):
+            raise ValueError()
+
+    pod, elapsed = run_pod((Broken, {}), restart="on-failure", backoff=0.01)
+    assert Broken.created == 2
+    assert elapsed < 1
+
+
+def test_backoff():
+    supervisor = Supervisor(None, {}, "always", None, 1, 4)
+    supervisor.started_at = 0
+    assert [supervisor.next_delay(1) for _ in range(4)] == [1, 2, 4, 4]
+    supervisor.started_at = 10
+    assert supervisor.next_delay(14) == 1
+
+
+def handler(name, calls):
+    def callback(**kwargs):
+        calls.append(name)
+        return name
+
+    return callback
+
+
+def test_dispatcher_connect():
+    loop = asyncio.new_event_loop()
+    loop.close()
+    dispatcher = SignalDispatcher(loop)
+    calls = []
+    a, b, c = handler("a", calls), handler("b", calls), handler("c", calls)
+    dispatcher.connect("sig", a)
+    dispatcher.connect("sig", a)
+    dispatcher.connect("sig", b, sender=1, label="x")
+    dispatcher.connect("sig", c, sender=2, label="y")
+    dispatcher.connect("other", c, sender=2, label="y")
+    assert dispatcher._callbacks("sig") == [a, b, c]
+    assert dispatcher._callbacks("sig", senders=[2]) == [c]
+    assert dispatcher._callbacks("sig", labels=["x"]) == [b]
+    assert dispatcher._callbacks("sig", labels=["z"]) == []
+
+    dispatcher.disconnect("sig", a)
+    assert dispatcher._callbacks("sig") == [b, c]
+    dispatcher.disconnect_sender(2)
+    assert dispatcher._callbacks("sig") == [b]
+    assert dispatcher._callbacks("other") == []
+    assert dispatcher._callbacks("sig", labels=["y"]) == []
+    dispatcher.disconnect("sig", b, sender=1)
+    assert dispatcher._callbacks("sig") == []
+    assert not dispatcher._senders and not dispatcher._labels
+
+
+@needs_loop_argument
+def test_dispatcher_send():
+    loop = asyncio.new_event_loop()
+    dispatcher = SignalDispatcher(loop)
+    calls = []
+    cancelled = []
+
+    async def slow(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fast(**kwargs):
+        return kwargs["value"]
+
+    def broken(**kwargs):
+        raise ValueError()
+
+    dispatcher.connect("sig", handler("a", calls), sender=1, label="x")
+    dispatcher.connect("sig", fast, sender=2, label="y")
+    dispatcher.connect("sig", broken, sender=3, label="y")
+    dispatcher.connect("sig", slow, sender=4, label="z")
+    try:
+        results = loop.run_until_complete(
+            dispatcher.send("sig", labels=["y", "z"], timeout=0.05, value=1)
+        )
+        loop.run_until_complete(asyncio.sleep(0))
+        assert sorted(map(repr, results)) == sorted(
+            map(repr, [1, ValueError(), asyncio.TimeoutError()])
+        )
+        assert cancelled == [True]
+        assert calls == []
+        results = loop.run_until_complete(dispatcher.send("sig", senders=[1]))
+        assert results == ["a"]
+        assert dispatcher.sent == {"sig": 2}
+        assert dispatcher.handled == {"sig": 4}
+    finally:
+        loop.close()
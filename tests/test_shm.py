@@ -0,0 +1,109 @@
+import asyncio
+import os
+
+import pytest
+
+from os_aio_pod.channel import ChannelClosed
+from os_aio_pod.shm import RingBuffer, ShmChannel, shm_paths
+
+
+def test_ring_buffer_wraps():
+    ring = RingBuffer(f"test-{os.getpid()}-ring", 100)
+    try:
+        records = [bytes([i]) * (i * 7 % 40) for i in range(50)]
+        got = []
+        for record in records:
+            if not ring.write(record):
+                got.extend(ring.read())
+                assert ring.write(record)
+        got.extend(ring.read())
+        assert got == records
+        with pytest.raises(ValueError):
+            ring.write(b"x" * 100)
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_shm_channel():
+    name = f"test-{os.getpid()}-channel"
+
+    async def flow(loop):
+        producer = ShmChannel(name, producer=True, size=64, loop=loop)
+        consumer = ShmChannel(name, size=64, loop=loop)
+
+        async def produce():
+            for i in range(20):
+                await producer.put(b"%d" % i)
+            producer.close()
+
+        producing = asyncio.ensure_future(produce())
+        records = []
+        try:
+            while True:
+                records.extend(await consumer.get_batch(3, timeout=1))
+        except ChannelClosed:
+            pass
+        await producing
+        return records
+
+    loop = asyncio.new_event_loop()
+    try:
+        records = loop.run_until_complete(flow(loop))
+    finally:
+        loop.close()
+    assert records == [b"%d" % i for i in range(20)]
+    assert not any(os.path.exists(path) for path in shm_paths(name))
+
+
+def test_ring_buffer_checks_existing_file():
+    name = f"test-{os.getpid()}-check"
+    ring = RingBuffer(name, 100)
+    try:
+        with pytest.raises(ValueError):
+            RingBuffer(name, 200)
+        other = RingBuffer(name, 100)
+        assert other.capacity == 100
+        other.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+    path = shm_paths(name)[0]
+    with open(path, "wb") as f:
+        f.write(b"\0" * 164)
+    try:
+        with pytest.raises(ValueError):
+            RingBuffer(name, 100)
+    finally:
+        os.unlink(path)
+
+
+def test_shm_channel_consumer_close():
+    name = f"test-{os.getpid()}-consumer-close"
+
+    async def flow(loop):
+        producer = ShmChannel(name, producer=True, size=64, loop=loop)
+        consumer = ShmChannel(name, size=64, loop=loop)
+        await producer.put(b"a")
+        assert await consumer.get() == b"a"
+
+        async def produce():
+            while True:
+                await producer.put(b"b" * 8)
+
+        producing = asyncio.ensure_future(produce())
+        await asyncio.sleep(0.01)
+        consumer.close()
+        with pytest.raises(ChannelClosed):
+            await asyncio.wait_for(producing, 1)
+        assert producer.closed
+        with pytest.raises(ChannelClosed):
+            producer.put_nowait(b"c")
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(flow(loop))
+    finally:
+        loop.close()
+    assert not any(os.path.exists(path) for path in shm_paths(name))
@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+
+from os_aio_pod.contrib.tcp_server import (
+    Config,
+    Connections,
+    DelimiterCodec,
+    FixedCodec,
+    FramedServerProtocol,
+    LengthCodec,
+)
+
+
+class Handler(asyncio.Protocol):
+    def __init__(self, loop, delay=0.1):
+        self.loop = loop
+        self.delay = delay
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.transport.track(self.loop.create_task(self.reply(data)))
+
+    async def reply(self, data):
+        self.transport.write(b"<" + data)
+        await asyncio.sleep(self.delay)
+        self.transport.write(data + b">")
+
+
+def run(main, **kwargs):
+    loop = asyncio.new_event_loop()
+    try:
+        connections = Connections(Config(**kwargs), loop)
+        factory = connections.wrap(lambda: Handler(loop))
+
+        async def serve():
+            server = await loop.create_server(factory, "127.0.0.1", 0)
+            try:
+                port = server.sockets[0].getsockname()[1]
+                return await main(loop, connections, port)
+            finally:
+                server.close()
+
+        return loop.run_until_complete(serve())
+    finally:
+        loop.close()
+
+
+def test_max_connections():
+    async def main(loop, connections, port):
+        first = await asyncio.open_connection("127.0.0.1", port)
+        second = await asyncio.open_connection("127.0.0.1", port)
+        assert await second[0].read() == b""
+        first[1].write(b"a")
+        assert await first[0].readexactly(4) == b"<aa>"
+        assert connections.stats()["rejected"] == 1
+        first[1].close()
+        await asyncio.sleep(0.05)
+        third = await asyncio.open_connection("127.0.0.1", port)
+        third[1].write(b"b")
+        assert await third[0].readexactly(4) == b"<bb>"
+        third[1].close()
+        return connections.stats()
+
+    stats = run(main, max_connections=1)
+    assert stats["accepted"] == 2
+    assert stats["rejected"] == 1
+
+
+def test_read_timeout():
+    async def main(loop, connections, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        start = loop.time()
+        assert await reader.read() == b""
+        writer.close()
+        return loop.time() - start, connections.stats()
+
+    elapsed, stats = run(main, read_timeout=0.05)
+    assert elapsed < 1
+    assert stats["timed_out"] == 1
+
+
+def test_idle_timeout_waits_for_tasks():
+    async def main(loop, connections, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"a")
+        assert await reader.readexactly(2) == b"<a"
+        await asyncio.sleep(0.07)
+        assert connections.stats()["timed_out"] == 0
+        assert await reader.read() == b"a>"
+        writer.close()
+        return connections.stats()
+
+    stats = run(main, idle_timeout=0.03)
+    assert stats["timed_out"] == 1
+
+
+def test_drain():
+    async def main(loop, connections, port):
+        busy = await asyncio.open_connection("127.0.0.1", port)
+        idle = await asyncio.open_connection("127.0.0.1", port)
+        busy[1].write(b"a")
+        assert await busy[0].readexactly(2) == b"<a"
+        await connections.drain()
+        assert await busy[0].read() == b"a>"
+        assert await idle[0].read() == b""
+        late = await asyncio.open_connection("127.0.0.1", port)
+        assert await late[0].read() == b""
+        for _, writer in (busy, idle, late):
+            writer.close()
+        return connections.stats()
+
+    stats = run(main)
+    assert stats["live"] == 0
+    assert stats["rejected"] == 1
+
+
+def test_drain_timeout():
+    async def main(loop, connections, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"a")
+        assert await reader.readexactly(2) == b"<a"
+        tasks = set(connections.tasks)
+        await connections.drain(0.01)
+        assert all(task.cancelled() for task in tasks)
+        assert await reader.read() == b""
+        writer.close()
+        return connections.stats()
+
+    assert run(main)["live"] == 0
+
+
+class Frames(object):
+    def __init__(self):
+        self.frames = []
+
+    def on_connection_made(self, protocol):
+        pass
+
+    def on_frame(self, protocol, frame):
+        self.frames.append(frame.tobytes())
+
+    def on_connection_lost(self, protocol, exc):
+        pass
+
+
+def feed(codec, *reads):
+    server = Frames()
+    protocol = FramedServerProtocol(server, 8, [], codec, None)
+    for data in reads:
+        while data:
+            buffer = protocol.get_buffer(-1)
+            size = min(len(buffer), len(data))
+            buffer[:size] = data[:size]
+            buffer.release()
+            protocol.buffer_updated(size)
+            data = data[size:]
+    protocol.connection_lost(None)
+    return server.frames
+
+
+def test_length_codec():
+    codec = LengthCodec(2, max_frame_size=100)
+    data = b"".join(b"".join(codec.encode(f)) for f in (b"a", b"", b"b" * 50))
+    assert feed(codec, data) == [b"a", b"", b"b" * 50]
+    assert feed(codec, data[:1], data[1:3], data[3:]) == [b"a", b"", b"b" * 50]
+    with pytest.raises(ValueError):
+        feed(codec, b"\x00\x65")
+
+
+def test_delimiter_codec():
+    codec = DelimiterCodec(b"\r\n", max_frame_size=100)
+    data = b"a\r\n\r\n" + b"b" * 50 + b"\r\nc"
+    assert feed(codec, data) == [b"a", b"", b"b" * 50]
+    reads = [data[i : i + 1] for i in range(len(data))]
+    assert feed(codec, *reads) == [b"a", b"", b"b" * 50]
+    assert feed(codec, b"a\r", b"\nb\r", b"\n") == [b"a", b"b"]
+    with pytest.raises(ValueError):
+        feed(codec, b"x" * 101)
+
+
+def test_fixed_codec():
+    codec = FixedCodec(3)
+    assert feed(codec, b"abcdefg", b"hi") == [b"abc", b"def", b"ghi"]
@@ -1,8 +1,29 @@
 from os_aio_pod.bean import Bean
-from os_aio_pod.utils import load_class
+from os_aio_pod.config import PodConfig, RestartPolicy
+from os_aio_pod.utils import load_class, load_pod_config
 
 
 def test_load_class():
 
     assert Bean == load_class("os_aio_pod.bean.Bean", Bean, True)
     assert load_class("os_aio_pod.bean.Bean", Bean) is None
+
+
+def test_load_pod_config(tmpdir):
+    bean_file = tmpdir.join("bean.py")
+    bean_file.write("label = 'shared'\nrestart = 'always'\ncore = 'ignored'\n")
+    pod_file = tmpdir.join("pod.py")
+    pod_file.write(
+        "BEANS = [{'core': 'a.b', 'config_file': %r}, {'core': 'c.d'}]\n"
+        "WORKERS = 2\n" % bean_file.strpath
+    )
+
+    config = load_pod_config(PodConfig, pod_file.strpath, [{"core": "e.f"}], debug=None)
+    assert config.WORKERS == 2
+    assert [b.core for b in config.BEANS] == ["a.b", "c.d", "e.f"]
+    assert config.BEANS[0].label == "shared"
+    assert config.BEANS[0].restart == RestartPolicy.always
+    assert config.BEANS[1].label is None
+
+    config = load_pod_config(PodConfig, pod_file.strpath, workers=3)
+    assert config.WORKERS == 3